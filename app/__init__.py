@@ -1,9 +1,23 @@
 # __init__.py
 from flask import Flask
+from flask.json.provider import JSONProvider
+import orjson
 import os
 
+class OrjsonProvider(JSONProvider):
+    """JSON provider that serializes responses with orjson"""
+    # Integer dict keys (e.g. city ids) are written as strings, like the stdlib json module
+    option = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+    
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, option=self.option).decode()
+    
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
 def create_app():
     app = Flask(__name__)
+    app.json = OrjsonProvider(app)
     app.config['SECRET_KEY'] = os.environ.get('SECRET_KEY', 'dev-secret-key-123')
     
     # Configure upload folder
@@ -22,6 +36,3 @@ def create_app():
     print("✅ Application initialized successfully")
     
     return app
-
-# Remove the immediate app creation at module level
-app = create_app()  
\ No newline at end of file
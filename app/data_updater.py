@@ -1,43 +1,207 @@
 # app/data_updater.py - Auto-updates traffic data
-import pandas as pd
+# pandas and pyarrow are imported inside the functions that use them to keep app startup light
 import numpy as np
-import requests
+import orjson
 import json
 import os
 import time
 import threading
-from datetime import datetime, timedelta
+from datetime import datetime
 from config import Config
-import random
+
+MODEL_STAT_TTL = 60  # Seconds between model file mtime checks
+EXISTS_TTL = 5  # Seconds a status file existence check is reused
+
+# path -> (exists, time.monotonic() of the check), for status polling
+_exists_cache = {}
+
+def _exists_cached(path):
+    """os.path.exists with a short TTL, so frequent status polls don't stat every time"""
+    now = time.monotonic()
+    entry = _exists_cache.get(path)
+    if entry is None or now - entry[1] > EXISTS_TTL:
+        entry = (os.path.exists(path), now)
+        _exists_cache[path] = entry
+    return entry[0]
+
+def _mark_exists(path):
+    """Record a file this process just wrote, so the TTL cache doesn't report it missing"""
+    _exists_cache[path] = (True, time.monotonic())
+
+# Dataset row count, keyed by (path, mtime, size) so unchanged files are served from memory
+_row_count_cache = {}
+
+def _count_csv_rows(path):
+    """Count the data rows of a CSV file by its line breaks, without parsing it"""
+    lines = 0
+    last = b'\n'
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            lines += chunk.count(b'\n')
+            last = chunk[-1:]
+    if last != b'\n':
+        lines += 1  # Last line has no trailing newline
+    return max(lines - 1, 0)  # Minus the header
+
+def _count_rows_cached(path):
+    """
+    Count dataset rows (Parquet from its metadata, CSV by line breaks) without
+    reading any column data; one stat per call, and None if the file doesn't exist
+    """
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    key = (path, st.st_mtime_ns, st.st_size)
+    count = _row_count_cache.get(key)
+    if count is None:
+        if path.endswith('.csv'):
+            count = _count_csv_rows(path)
+        else:
+            import pyarrow.parquet as pq
+            count = pq.ParquetFile(path).metadata.num_rows
+        _row_count_cache.clear()
+        _row_count_cache[key] = count
+    return count
+
+def _write_parquet_snapshot(rows, path):
+    """Write an int8 array of dataset rows (DATASET_COLUMNS order) as snappy-compressed Parquet"""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    
+    table = pa.table({name: rows[:, i] for i, name in enumerate(Config.DATASET_COLUMNS)})
+    _write_atomic(path, lambda tmp_path: pq.write_table(table, tmp_path, compression='snappy'))
+
+def _write_atomic(path, write):
+    """Call write(tmp_path) next to path, then swap the file into place so readers never see it half-written"""
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        write(tmp_path)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+def _load_seed_dataset():
+    """Load the dataset used to seed the ring buffer on first run"""
+    import pandas as pd
+    
+    if os.path.exists(Config.TRAFFIC_DATASET_PATH):
+        # Read once, at ring buffer creation; the buffer is the working copy afterwards
+        df = pd.read_parquet(Config.TRAFFIC_DATASET_PATH, columns=Config.DATASET_COLUMNS, engine='pyarrow')
+        return df.astype(Config.DATASET_DTYPES, copy=False)  # No-op for files written as int8
+    if os.path.exists(Config.LEGACY_DATASET_PATH):
+        # Migrate the old CSV dataset
+        return pd.read_csv(Config.LEGACY_DATASET_PATH, usecols=Config.DATASET_COLUMNS,
+                           dtype=Config.DATASET_DTYPES)
+    
+    # Create new dataset if doesn't exist
+    from scripts.generate_realistic_data import generate_realistic_tunisian_traffic_data
+    return generate_realistic_tunisian_traffic_data(1000)
+
+# City-specific traffic adjustments
+CITY_TRAFFIC_WEIGHTS = {0: 1.2, 1: 1.1, 2: 1.0, 3: 0.9}
+BUSY_CITIES = (0, 1)  # Tunis & Ariana get an extra rush-hour bonus
+
+# Per-city arrays for the vectorized live-data simulation
+_city_ids = np.array(list(Config.CITIES.keys()), dtype=np.int32)
+_city_names = [city["name"] for city in Config.CITIES.values()]
+_city_lats = [city["lat"] for city in Config.CITIES.values()]
+_city_lngs = [city["lng"] for city in Config.CITIES.values()]
+_city_weights = np.array([CITY_TRAFFIC_WEIGHTS.get(c, 1.0) for c in _city_ids.tolist()])
+_city_is_busy = np.isin(_city_ids, BUSY_CITIES)
+_city_index = {city_id: i for i, city_id in enumerate(_city_ids.tolist())}
+
+def _time_of_day_score(hour, day):
+    """Score shared by all cities, plus the extra rush-hour bonus for busy cities"""
+    score = 0.5  # Base score
+    busy_bonus = 0.0
+    
+    # Time of day impact
+    if 7 <= hour <= 9:  # Morning rush
+        score += 0.3
+        busy_bonus = 0.2  # Tunis & Ariana are busier
+    
+    elif 12 <= hour <= 14:  # Lunch time
+        score += 0.1
+    
+    elif 16 <= hour <= 19:  # Evening rush
+        score += 0.4
+        busy_bonus = 0.2
+    
+    elif 20 <= hour <= 23 or 0 <= hour <= 5:  # Night
+        score -= 0.2
+    
+    # Day of week impact
+    if day == 4:  # Friday
+        if 11 <= hour <= 14:  # Prayer time
+            score += 0.3
+    
+    if day >= 5:  # Weekend
+        if 10 <= hour <= 18:
+            score += 0.1
+        else:
+            score -= 0.1
+    
+    return score, busy_bonus
+
+def _compute_realistic_traffic(hour, day, city_id):
+    """Traffic score rules behind the _TRAFFIC_BASE lookup table"""
+    score, busy_bonus = _time_of_day_score(hour, day)
+    if city_id in BUSY_CITIES:
+        score += busy_bonus
+    
+    # City-specific adjustments
+    score *= CITY_TRAFFIC_WEIGHTS.get(city_id, 1.0)
+    
+    return max(0, min(1, score))
+
+# Base traffic score for every (hour, day, city), built once at import
+_TRAFFIC_BASE = np.empty((24, 7, len(_city_ids)), dtype=np.float32)
+for _hour in range(24):
+    for _day in range(7):
+        for _i, _city_id in enumerate(_city_ids.tolist()):
+            _TRAFFIC_BASE[_hour, _day, _i] = _compute_realistic_traffic(_hour, _day, _city_id)
 
 class TrafficDataUpdater:
     """Handles automatic updates of traffic data"""
     
     def __init__(self):
-        self.last_update = None
+        self.last_update = None  # Epoch seconds; formatted to ISO only for display
         self.live_data = {}
-        self.update_thread = None
+        self.scheduler = None
         self.running = False
+        self._rng = np.random.default_rng()
+        self._buffer = None
+        self._buffer_head = 0
+        self._buffer_size = 0
+        self._cycles_since_flush = 0
+        self._interval_seconds = Config.DATA_UPDATE_INTERVAL.total_seconds()
+        self._job_interval_seconds = None  # Scheduler job interval, set by start_auto_updates
+        self._model_mtime = None
+        self._last_stat_monotonic = None
         
     def load_last_update_time(self):
         """Load the last update time from file"""
         try:
             if os.path.exists(Config.LAST_UPDATE_FILE):
                 with open(Config.LAST_UPDATE_FILE, 'r') as f:
-                    self.last_update = datetime.fromisoformat(f.read().strip())
-                    print(f"📅 Last update: {self.last_update}")
+                    self.last_update = datetime.fromisoformat(f.read().strip()).timestamp()
+                    print(f"📅 Last update: {datetime.fromtimestamp(self.last_update)}")
             else:
-                self.last_update = datetime.now() - timedelta(days=1)  # Default to yesterday
+                self.last_update = time.time() - 86400  # Default to yesterday
         except Exception as e:
             print(f"❌ Error loading last update time: {e}")
-            self.last_update = datetime.now() - timedelta(days=1)
+            self.last_update = time.time() - 86400
     
     def save_last_update_time(self):
         """Save the current update time to file"""
         try:
+            self.last_update = time.time()
+            saved_at = datetime.fromtimestamp(self.last_update)
             with open(Config.LAST_UPDATE_FILE, 'w') as f:
-                f.write(datetime.now().isoformat())
-            print(f"💾 Saved update time: {datetime.now()}")
+                f.write(saved_at.isoformat())
+            print(f"💾 Saved update time: {saved_at}")
         except Exception as e:
             print(f"❌ Error saving update time: {e}")
     
@@ -53,8 +217,9 @@ class TrafficDataUpdater:
             live_data = self.generate_simulated_live_data()
             
             # Save to file
-            with open(Config.LIVE_DATA_PATH, 'w') as f:
-                json.dump(live_data, f, indent=2)
+            with open(Config.LIVE_DATA_PATH, 'wb') as f:
+                f.write(orjson.dumps(live_data, option=orjson.OPT_SERIALIZE_NUMPY))
+            _mark_exists(Config.LIVE_DATA_PATH)
             
             print(f"✅ Live data saved: {len(live_data['data'])} records")
             return live_data
@@ -66,126 +231,182 @@ class TrafficDataUpdater:
     def generate_simulated_live_data(self):
         """Generate realistic simulated traffic data"""
         now = datetime.now()
-        cities = Config.CITIES
+        now_iso = now.isoformat()
+        n = len(_city_ids)
         
         data = {
-            "timestamp": now.isoformat(),
+            "timestamp": now_iso,
             "source": "simulated",
             "data": []
         }
         
-        for city_id, city_info in cities.items():
-            hour = now.hour
-            day = now.weekday()
-            
-            # Generate realistic traffic levels based on time and city
-            base_traffic = self.calculate_realistic_traffic(hour, day, city_id)
-            
-            # Add some randomness
-            traffic_level = base_traffic + random.uniform(-0.2, 0.2)
-            traffic_level = max(0, min(1, traffic_level))
-            
-            # Convert to categorical
-            if traffic_level < Config.TRAFFIC_THRESHOLDS['low']:
-                level = 0  # Low
-            elif traffic_level < Config.TRAFFIC_THRESHOLDS['medium']:
-                level = 1  # Medium
-            else:
-                level = 2  # High
-            
+        # Generate realistic traffic levels for all cities at once
+        base_traffic = self.calculate_realistic_traffic_batch(now.hour, now.weekday())
+        
+        # Add some randomness
+        traffic_scores = np.clip(base_traffic + self._rng.uniform(-0.2, 0.2, n), 0, 1)
+        
+        # Convert to categorical (0=Low, 1=Medium, 2=High)
+        levels = np.digitize(traffic_scores, [Config.TRAFFIC_THRESHOLDS['low'],
+                                              Config.TRAFFIC_THRESHOLDS['medium']])
+        speeds = self._rng.integers(20, 81, n)  # km/h
+        congestion = self._rng.integers(10, 96, n)  # percentage
+        weather = self._rng.integers(0, 3, n)  # Random weather
+        
+        for city_id, name, lat, lng, level, score, speed, cong, wx in zip(
+                _city_ids.tolist(), _city_names, _city_lats, _city_lngs, levels.tolist(),
+                traffic_scores.tolist(), speeds.tolist(), congestion.tolist(), weather.tolist()):
             data["data"].append({
                 "city_id": city_id,
-                "city_name": city_info["name"],
-                "lat": city_info["lat"],
-                "lng": city_info["lng"],
+                "city_name": name,
+                "lat": lat,
+                "lng": lng,
                 "traffic_level": level,
-                "traffic_score": traffic_level,
-                "speed": random.randint(20, 80),  # km/h
-                "congestion": random.randint(10, 95),  # percentage
-                "last_updated": now.isoformat()
+                "traffic_score": score,
+                "speed": speed,
+                "congestion": cong,
+                "weather": wx,
+                "last_updated": now_iso
             })
         
         return data
     
     def calculate_realistic_traffic(self, hour, day, city_id):
         """Calculate realistic traffic score for Tunisian cities"""
-        score = 0.5  # Base score
+        index = _city_index.get(city_id)
+        if index is None or not (0 <= hour < 24 and 0 <= day < 7):
+            return _compute_realistic_traffic(hour, day, city_id)
+        return float(_TRAFFIC_BASE[hour, day, index])
+    
+    def calculate_realistic_traffic_batch(self, hour, day):
+        """Calculate realistic traffic scores for every configured city in one pass"""
+        return _TRAFFIC_BASE[hour, day]
+    
+    def _open_ring_buffer(self):
+        """Memory-map the dataset ring buffer, creating it from the seed dataset if needed"""
+        if self._buffer is not None:
+            return
         
-        # Time of day impact
-        if 7 <= hour <= 9:  # Morning rush
-            score += 0.3
-            if city_id in [0, 1]:  # Tunis & Ariana are busier
-                score += 0.2
+        capacity = Config.DATASET_MAX_ROWS
+        width = len(Config.DATASET_COLUMNS)
         
-        elif 12 <= hour <= 14:  # Lunch time
-            score += 0.1
+        if os.path.exists(Config.TRAFFIC_BUFFER_PATH) and os.path.exists(Config.TRAFFIC_BUFFER_STATE_PATH):
+            self._buffer = np.lib.format.open_memmap(Config.TRAFFIC_BUFFER_PATH, mode='r+')
+            with open(Config.TRAFFIC_BUFFER_STATE_PATH, 'r') as f:
+                state = json.load(f)
+            self._buffer_head = state['head']
+            self._buffer_size = state['size']
+            return
         
-        elif 16 <= hour <= 19:  # Evening rush
-            score += 0.4
-            if city_id in [0, 1]:
-                score += 0.2
+        seed = _load_seed_dataset()[Config.DATASET_COLUMNS].tail(capacity).to_numpy(dtype=np.int8)
+        self._buffer = np.lib.format.open_memmap(
+            Config.TRAFFIC_BUFFER_PATH, mode='w+', dtype=np.int8, shape=(capacity, width)
+        )
+        self._buffer[:len(seed)] = seed
+        self._buffer.flush()
+        self._buffer_size = len(seed)
+        self._buffer_head = len(seed) % capacity
+        self._save_ring_buffer_state()
+        print(f"📦 Dataset ring buffer created with {len(seed)} records")
+    
+    @staticmethod
+    def _saved_buffer_size():
+        """Fill level recorded in the ring buffer state file, or None if there is none"""
+        try:
+            with open(Config.TRAFFIC_BUFFER_STATE_PATH, 'r') as f:
+                return int(json.load(f)['size'])
+        except (FileNotFoundError, ValueError, KeyError, TypeError):
+            return None
+    
+    def _save_ring_buffer_state(self):
+        """Persist the ring buffer head index and fill level"""
+        state = {"head": self._buffer_head, "size": self._buffer_size}
         
-        elif 20 <= hour <= 23 or 0 <= hour <= 5:  # Night
-            score -= 0.2
+        def write(path):
+            with open(path, 'w') as f:
+                json.dump(state, f)
         
-        # Day of week impact
-        if day == 4:  # Friday
-            if 11 <= hour <= 14:  # Prayer time
-                score += 0.3
+        _write_atomic(Config.TRAFFIC_BUFFER_STATE_PATH, write)
+    
+    def _append_to_ring_buffer(self, rows):
+        """Write new rows at the ring buffer head, overwriting the oldest ones"""
+        capacity = len(self._buffer)
+        rows = rows[-capacity:]
+        n = len(rows)
         
-        if day >= 5:  # Weekend
-            if 10 <= hour <= 18:
-                score += 0.1
-            else:
-                score -= 0.1
+        positions = (self._buffer_head + np.arange(n)) % capacity
+        self._buffer[positions] = rows
+        self._buffer.flush()
         
-        # City-specific adjustments
-        city_weights = {0: 1.2, 1: 1.1, 2: 1.0, 3: 0.9}
-        score *= city_weights.get(city_id, 1.0)
+        self._buffer_head = (self._buffer_head + n) % capacity
+        self._buffer_size = min(self._buffer_size + n, capacity)
+        self._save_ring_buffer_state()
+    
+    def _ring_buffer_rows(self):
+        """Return the ring buffer contents as an array, oldest rows first"""
+        if self._buffer_size < len(self._buffer):
+            return np.array(self._buffer[:self._buffer_size])
+        return np.roll(np.asarray(self._buffer), -self._buffer_head, axis=0)
+    
+    def load_recent_dataset(self):
+        """Return the recent dataset window as a DataFrame, oldest rows first"""
+        import pandas as pd
         
-        return max(0, min(1, score))
+        self._open_ring_buffer()
+        return pd.DataFrame(self._ring_buffer_rows(), columns=Config.DATASET_COLUMNS)
     
-    def update_dataset_with_live_data(self):
-        """Update the main dataset with live data"""
+    def _flush_recent_snapshot(self):
+        """Write the recent window to the Parquet dataset from a background thread"""
+        snapshot = self._ring_buffer_rows()  # A copy, so later appends don't race the writer
+        
+        def flush():
+            try:
+                _write_parquet_snapshot(snapshot, Config.TRAFFIC_DATASET_PATH)
+                print(f"💾 Dataset snapshot saved: {len(snapshot)} records")
+            except Exception as e:
+                print(f"❌ Error saving dataset snapshot: {e}")
+        
+        threading.Thread(target=flush, daemon=True).start()
+    
+    def update_dataset_with_live_data(self, live_data=None):
+        """Update the main dataset with live data (read from LIVE_DATA_PATH if not given)"""
         try:
-            # Load current dataset
-            if os.path.exists(Config.TRAFFIC_DATASET_PATH):
-                df = pd.read_csv(Config.TRAFFIC_DATASET_PATH)
-            else:
-                # Create new dataset if doesn't exist
-                from scripts.generate_realistic_data import generate_realistic_tunisian_traffic_data
-                df = generate_realistic_tunisian_traffic_data(1000)
+            # Open the dataset ring buffer
+            self._open_ring_buffer()
             
-            # Load live data
-            if os.path.exists(Config.LIVE_DATA_PATH):
+            # Load live data unless the caller already has it in memory
+            if live_data is None and os.path.exists(Config.LIVE_DATA_PATH):
                 with open(Config.LIVE_DATA_PATH, 'r') as f:
                     live_data = json.load(f)
-                
-                # Convert live data to dataframe format
+            
+            if live_data is not None:
+                # Build the new rows column by column with their final int8 dtype
                 now = datetime.now()
-                new_rows = []
+                records = live_data['data']
+                n = len(records)
                 
-                for record in live_data['data']:
-                    new_row = {
-                        'hour': now.hour,
-                        'day': now.weekday(),
-                        'weekend': 1 if now.weekday() >= 5 else 0,
-                        'city': record['city_id'],
-                        'weather': random.randint(0, 2),  # Random weather
-                        'traffic': record['traffic_level']
-                    }
-                    new_rows.append(new_row)
+                hours = np.full(n, now.hour, dtype=np.int8)
+                days = np.full(n, now.weekday(), dtype=np.int8)
+                weekend = np.full(n, 1 if now.weekday() >= 5 else 0, dtype=np.int8)
+                city = np.fromiter((r['city_id'] for r in records), dtype=np.int8, count=n)
+                traffic = np.fromiter((r['traffic_level'] for r in records), dtype=np.int8, count=n)
                 
-                # Add new data to dataset
-                new_df = pd.DataFrame(new_rows)
-                df = pd.concat([df, new_df], ignore_index=True)
+                # Weather is drawn with the rest of the simulated batch; older files lack it
+                weather = np.fromiter((r.get('weather', -1) for r in records), dtype=np.int8, count=n)
+                missing = weather < 0
+                if missing.any():
+                    weather[missing] = self._rng.integers(0, 3, int(missing.sum()))
                 
-                # Keep only recent data (last 30 days equivalent)
-                df = df.tail(10000)
+                # Append only the new rows; the buffer drops the oldest ones
+                rows = np.column_stack([hours, days, weekend, city, weather, traffic])
+                self._append_to_ring_buffer(rows)
+                print(f"✅ Dataset updated: {self._buffer_size} total records")
                 
-                # Save updated dataset
-                df.to_csv(Config.TRAFFIC_DATASET_PATH, index=False)
-                print(f"✅ Dataset updated: {len(df)} total records")
+                # Periodically snapshot the window to Parquet for standalone training
+                self._cycles_since_flush += 1
+                if self._cycles_since_flush >= Config.DATASET_FLUSH_CYCLES:
+                    self._cycles_since_flush = 0
+                    self._flush_recent_snapshot()
                 
                 # Check if model needs retraining
                 self.check_model_retraining()
@@ -199,11 +420,13 @@ class TrafficDataUpdater:
     def check_model_retraining(self):
         """Check if model needs retraining based on data age"""
         try:
-            # Check when model was last trained
-            model_time = datetime.fromtimestamp(os.path.getmtime(Config.MODEL_PATH))
-            days_since_training = (datetime.now() - model_time).days
+            # Check when model was last trained, re-reading the file mtime at most once a minute
+            now = time.monotonic()
+            if self._last_stat_monotonic is None or now - self._last_stat_monotonic > MODEL_STAT_TTL:
+                self._model_mtime = os.path.getmtime(Config.MODEL_PATH)
+                self._last_stat_monotonic = now
             
-            if days_since_training >= 7:  # Retrain weekly
+            if time.time() - self._model_mtime >= Config.MODEL_RETRAIN_INTERVAL.total_seconds():
                 print("🤖 Model retraining needed...")
                 self.retrain_model()
                 
@@ -223,7 +446,10 @@ class TrafficDataUpdater:
             sys.path.append(os.path.dirname(Config.BASE_DIR))
             
             from scripts.train_improved import train_improved_model
-            train_improved_model()
+            # Train on the ring buffer window; uncompiled, as compiling on the scheduler
+            # thread costs more than it saves on a small retrain and needs a C++ toolchain
+            train_improved_model(self.load_recent_dataset(), compile_model=False)
+            self._last_stat_monotonic = None  # Model file changed; re-stat on next check
             
             print("✅ Model retraining completed")
             
@@ -235,56 +461,67 @@ class TrafficDataUpdater:
         if not self.last_update:
             self.load_last_update_time()
         
-        time_since_update = datetime.now() - self.last_update
-        return time_since_update >= Config.DATA_UPDATE_INTERVAL
+        return time.time() - self.last_update >= self._interval_seconds
     
     def perform_update(self):
         """Perform a complete data update"""
         print("🚀 Starting data update cycle...")
         
         # Fetch live data
-        self.fetch_live_traffic_data()
+        live_data = self.fetch_live_traffic_data()
         
-        # Update dataset
-        self.update_dataset_with_live_data()
+        # Update dataset straight from the fetched data; the file on disk is only for durability
+        self.update_dataset_with_live_data(live_data=live_data)
         
         # Save update time
         self.save_last_update_time()
         
         print("✅ Update cycle completed")
     
-    def start_auto_updates(self, interval_minutes=60):
-        """Start automatic updates in background thread"""
+    def _run_scheduled_update(self):
+        """Scheduler job: run an update cycle if one is due"""
+        try:
+            # A job firing no more often than the update interval is already spaced by the scheduler;
+            # last_update is set when a cycle ends, so should_update() would skip every other tick.
+            if self._job_interval_seconds >= self._interval_seconds or self.should_update():
+                self.perform_update()
+            else:
+                print(f"⏳ Next update in: {self.get_time_until_next_update()}")
+        except Exception as e:
+            print(f"❌ Error in scheduled update: {e}")
+    
+    def start_auto_updates(self, interval_minutes=None):
+        """Start automatic updates on a background scheduler"""
         if self.running:
             print("⚠️ Auto-updates already running")
             return
         
-        self.running = True
+        from apscheduler.schedulers.background import BackgroundScheduler
+        
+        if interval_minutes is None:
+            interval_minutes = Config.DATA_UPDATE_INTERVAL.total_seconds() / 60
         
-        def update_loop():
-            while self.running:
-                try:
-                    if self.should_update():
-                        self.perform_update()
-                    else:
-                        print(f"⏳ Next update in: {self.get_time_until_next_update()}")
-                    
-                    # Sleep for specified interval
-                    time.sleep(interval_minutes * 60)
-                    
-                except Exception as e:
-                    print(f"❌ Error in update loop: {e}")
-                    time.sleep(300)  # Wait 5 minutes on error
-        
-        self.update_thread = threading.Thread(target=update_loop, daemon=True)
-        self.update_thread.start()
-        print(f"🔄 Auto-updates started (every {interval_minutes} minutes)")
+        # First run when the next update is due, then every interval
+        if not self.last_update:
+            self.load_last_update_time()
+        first_run = datetime.fromtimestamp(max(time.time(), self.last_update + self._interval_seconds))
+        
+        self._job_interval_seconds = interval_minutes * 60
+        self.scheduler = BackgroundScheduler(daemon=True)
+        self.scheduler.add_job(
+            self._run_scheduled_update, trigger='interval', minutes=interval_minutes,
+            next_run_time=first_run, max_instances=1, coalesce=True
+        )
+        self.scheduler.start()
+        self.running = True
+        print(f"🔄 Auto-updates started (every {interval_minutes:g} minutes)")
     
     def stop_auto_updates(self):
         """Stop automatic updates"""
         self.running = False
-        if self.update_thread:
-            self.update_thread.join(timeout=5)
+        if self.scheduler:
+            self.scheduler.shutdown(wait=False)
+            self.scheduler = None
         print("🛑 Auto-updates stopped")
     
     def get_time_until_next_update(self):
@@ -292,14 +529,13 @@ class TrafficDataUpdater:
         if not self.last_update:
             return "Now"
         
-        next_update = self.last_update + Config.DATA_UPDATE_INTERVAL
-        time_until = next_update - datetime.now()
+        time_until = self.last_update + self._interval_seconds - time.time()
         
-        if time_until.total_seconds() <= 0:
+        if time_until <= 0:
             return "Now"
         
-        hours = int(time_until.total_seconds() // 3600)
-        minutes = int((time_until.total_seconds() % 3600) // 60)
+        hours = int(time_until // 3600)
+        minutes = int((time_until % 3600) // 60)
         
         return f"{hours}h {minutes}m"
     
@@ -308,15 +544,23 @@ class TrafficDataUpdater:
         self.load_last_update_time()
         
         info = {
-            "last_update": self.last_update.isoformat() if self.last_update else "Never",
+            "last_update": datetime.fromtimestamp(self.last_update).isoformat() if self.last_update else "Never",
             "next_update": self.get_time_until_next_update(),
-            "live_data_available": os.path.exists(Config.LIVE_DATA_PATH),
+            "live_data_available": _exists_cached(Config.LIVE_DATA_PATH),
             "dataset_size": 0
         }
         
-        if os.path.exists(Config.TRAFFIC_DATASET_PATH):
-            df = pd.read_csv(Config.TRAFFIC_DATASET_PATH)
-            info["dataset_size"] = len(df)
+        # The open ring buffer, else its state file (the Parquet snapshot lags it by up
+        # to DATASET_FLUSH_CYCLES updates), else the Parquet or legacy CSV dataset
+        if self._buffer is not None:
+            size = self._buffer_size
+        else:
+            size = self._saved_buffer_size()
+        if size is None:
+            size = _count_rows_cached(Config.TRAFFIC_DATASET_PATH)
+        if size is None:
+            size = _count_rows_cached(Config.LEGACY_DATASET_PATH)
+        info["dataset_size"] = size or 0
         
         return info
 
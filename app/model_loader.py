@@ -1,40 +1,111 @@
 # app/model_loader.py - Simple version
-import torch
+import numpy as np
 import os
+from config import Config
+
+# Score contribution per hour of day: morning rush, evening rush, lunch time
+_HOUR_SCORE = np.array([
+    2.0 if 7 <= h <= 9 else 2.5 if 16 <= h <= 19 else 1.0 if 12 <= h <= 14 else 0.0
+    for h in range(24)
+], dtype=np.float32)
+
+# Score contribution per city: Tunis, Ariana
+_CITY_SCORE = {0: 1.0, 1: 0.5}
+
+# Score thresholds between Low/Medium and Medium/High
+_LEVEL_BOUNDS = np.array([1.5, 3.5], dtype=np.float32)
 
 def predict(features):
     """Simple prediction function"""
     hour, day, weekend, city_id, weather = features
     
-    # Simple prediction logic
-    score = 0
+    score = ((_HOUR_SCORE[hour] if 0 <= hour < 24 else 0.0)
+             + (1.0 if day == 4 else 0.0)  # Friday
+             + _CITY_SCORE.get(city_id, 0.0)
+             + (1.0 if weather == 1 else 0.0))  # Rain
     
-    # Time impact
-    if 7 <= hour <= 9:
-        score += 2
-    elif 16 <= hour <= 19:
-        score += 2.5
-    elif 12 <= hour <= 14:
-        score += 1
+    # Determine traffic level
+    return 2 if score >= 3.5 else 1 if score >= 1.5 else 0
+
+def predict_batch(features):
+    """Vectorized predict over an (N, 5) array of hour, day, weekend, city, weather rows"""
+    features = np.asarray(features)
+    hour, day, city_id, weather = features[:, 0], features[:, 1], features[:, 3], features[:, 4]
     
-    # Day impact
-    if day == 4:  # Friday
-        score += 1
+    score = (_HOUR_SCORE[hour]
+             + (day == 4)
+             + np.where(city_id == 0, _CITY_SCORE[0], np.where(city_id == 1, _CITY_SCORE[1], 0.0))
+             + (weather == 1))
     
-    # City impact
-    if city_id == 0:  # Tunis
-        score += 1
-    elif city_id == 1:  # Ariana
-        score += 0.5
+    return np.digitize(score, _LEVEL_BOUNDS)
+
+# Per-city rows of the Config.FEATURE_COLUMNS layout for the model's cities;
+# only the city and city_weight columns are fixed, the rest are filled per call.
+# scripts/train_improved.py checks these rows against create_enhanced_features.
+_FEATURE_INDEX = {name: i for i, name in enumerate(Config.FEATURE_COLUMNS)}
+_MODEL_CITY_WEIGHTS = np.array([1.0, 0.8, 0.6, 0.5], dtype=np.float32)
+_CITY_FEATURES = np.zeros((len(_MODEL_CITY_WEIGHTS), len(Config.FEATURE_COLUMNS)), dtype=np.float32)
+_CITY_FEATURES[:, _FEATURE_INDEX['city']] = np.arange(len(_MODEL_CITY_WEIGHTS))
+_CITY_FEATURES[:, _FEATURE_INDEX['city_weight']] = _MODEL_CITY_WEIGHTS
+_WEATHER_IMPACT = (0.0, 1.0, 0.5)
+
+# Features with the same value for every city, in the order city_feature_rows fills them
+_SHARED_FEATURES = ('hour', 'day', 'weekend', 'weather', 'sin_hour', 'cos_hour', 'sin_day', 'cos_day',
+                    'rush_hour', 'night_hour', 'friday', 'monday', 'weather_impact')
+_SHARED_COLUMNS = [_FEATURE_INDEX[name] for name in _SHARED_FEATURES]
+
+def city_feature_rows(hour, day, weather):
+    """Model input rows for every model city at this hour, day and weather"""
+    weekend = 1.0 if day >= 5 else 0.0
+    rush_hour = 1.0 if (7 <= hour <= 9) or (16 <= hour <= 19) else 0.0
+    # float32 angles, like the trainer, so the rows match it exactly
+    hour_angle = np.float32(hour) * np.float32(2 * np.pi / 24)
+    day_angle = np.float32(day) * np.float32(2 * np.pi / 7)
     
-    # Weather impact
-    if weather == 1:  # Rain
-        score += 1
+    features = _CITY_FEATURES.copy()
+    features[:, _SHARED_COLUMNS] = (
+        hour, day, weekend, weather,
+        np.sin(hour_angle), np.cos(hour_angle), np.sin(day_angle), np.cos(day_angle),
+        rush_hour, 1.0 if 0 <= hour <= 5 else 0.0,
+        1.0 if day == 4 else 0.0, 1.0 if day == 0 else 0.0,
+        _WEATHER_IMPACT[weather]
+    )
+    features[:, _FEATURE_INDEX['rush_city']] = rush_hour * _MODEL_CITY_WEIGHTS
+    features[:, _FEATURE_INDEX['weekend_city']] = weekend * _MODEL_CITY_WEIGHTS
+    return features
+
+def predict_cities_batch(model, hour, day, weather):
+    """Traffic level for every model city in a single forward pass"""
+    import torch
+    features = city_feature_rows(hour, day, weather)
     
-    # Determine traffic level
-    if score >= 3.5:
-        return 2  # High
-    elif score >= 1.5:
-        return 1  # Medium
-    else:
-        return 0  # Low
\ No newline at end of file
+    with torch.no_grad():
+        logits = model(torch.from_numpy(features))
+    return logits.argmax(1).numpy()
+
+# path -> (mtime_ns, model) of the loaded TorchScript exports
+_torchscript_models = {}
+
+def _load_torchscript(path):
+    """
+    Load a TorchScript model exported by train_improved.py, or None if missing;
+    reloaded only when a retrain has replaced the file
+    """
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        return None
+    entry = _torchscript_models.get(path)
+    if entry is None or entry[0] != mtime:
+        import torch  # Only needed once a model is actually served
+        entry = (mtime, torch.jit.load(path, map_location='cpu'))
+        _torchscript_models[path] = entry
+    return entry[1]
+
+def load_traced_model(path=Config.TRACED_MODEL_PATH):
+    """Load the frozen float32 TorchScript model"""
+    return _load_torchscript(path)
+
+def load_quantized_model(path=Config.QUANTIZED_MODEL_PATH):
+    """Load the int8 TorchScript model for CPU inference; inputs must be float32"""
+    return _load_torchscript(path)
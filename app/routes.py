@@ -1,11 +1,17 @@
 # routes.py - Free version using OpenStreetMap
-from flask import Blueprint, render_template, request, jsonify, current_app
+from flask import Blueprint, Response, render_template, request, jsonify, current_app
 from datetime import datetime, timedelta
-import json
+from functools import lru_cache
+from jinja2.utils import htmlsafe_json_dumps
+from markupsafe import Markup, escape
+import hashlib
 import os
 import requests
 import numpy as np
-from math import radians, sin, cos, sqrt, atan2
+import orjson
+from math import radians, sin, cos, sqrt, asin
+from config import Config
+from .model_loader import load_quantized_model, load_traced_model, predict_cities_batch
 
 main = Blueprint('main', __name__)
 
@@ -13,22 +19,34 @@ main = Blueprint('main', __name__)
 DATA_DIR = os.path.join(os.path.dirname(__file__), 'data')
 CITIES_FILE = os.path.join(DATA_DIR, 'tunisia_cities.json')
 
-# Load cities data
+BAKED_CITIES_FILE = os.path.join(DATA_DIR, '_cities_baked.py')  # Generated by scripts/bake_cities.py
+
+def _baked_cities_current():
+    """Whether the baked cities module exists and is no older than the JSON it was generated from"""
+    try:
+        return os.path.getmtime(BAKED_CITIES_FILE) >= os.path.getmtime(CITIES_FILE)
+    except OSError:
+        return os.path.exists(BAKED_CITIES_FILE)
+
+# Load cities data, preferring the baked module unless the JSON has been edited since
 CITIES = {}
-try:
-    if os.path.exists(CITIES_FILE):
-        with open(CITIES_FILE, 'r', encoding='utf-8') as f:
-            raw = json.load(f)
-            for k, v in raw.items():
-                try:
-                    CITIES[int(k)] = v
-                except:
-                    pass
-    else:
+if _baked_cities_current():
+    from app.data._cities_baked import CITIES
+else:
+    try:
+        if os.path.exists(CITIES_FILE):
+            with open(CITIES_FILE, 'rb') as f:
+                raw = orjson.loads(f.read())
+                for k, v in raw.items():
+                    try:
+                        CITIES[int(k)] = v
+                    except:
+                        pass
+        else:
+            CITIES = {}
+    except Exception as e:
+        print(f"Warning: unable to load cities file: {e}")
         CITIES = {}
-except Exception as e:
-    print(f"Warning: unable to load cities file: {e}")
-    CITIES = {}
 
 # Group cities by governorate for dropdown
 GOVERNORATES = {}
@@ -49,27 +67,135 @@ WEATHER_CONDITIONS = {
     2: {"name": "Fog", "emoji": "🌫️", "impact": 0.5}
 }
 
+# List-indexed views of CITIES / WEATHER_CONDITIONS for the per-request lookups
+_CITY_LIST = [CITIES.get(i) for i in range(max(CITIES, default=-1) + 1)]
+_DEFAULT_CITY = CITIES.get(0)
+_WEATHER_LIST = [WEATHER_CONDITIONS[i] for i in range(len(WEATHER_CONDITIONS))]
+
+def _lookup_city(city_id):
+    """Return the city with this id, or None if there is none"""
+    if not isinstance(city_id, int):
+        return CITIES.get(city_id)  # e.g. 1.0 from a JSON body still finds city 1
+    return _CITY_LIST[city_id] if 0 <= city_id < len(_CITY_LIST) else None
+
+def _lookup_weather(weather):
+    """Return the weather condition for this id, defaulting to Clear"""
+    if not isinstance(weather, int):
+        return WEATHER_CONDITIONS.get(weather, _WEATHER_LIST[0])  # 1.0 is Rain, "1" is unknown
+    return _WEATHER_LIST[weather] if 0 <= weather < len(_WEATHER_LIST) else _WEATHER_LIST[0]
+
+# Per-city columns (SoA) for the all-cities endpoints
+_CITY_IDS = list(CITIES)
+_CITY_NAMES = [c.get('name', 'Unknown') for c in CITIES.values()]
+_CITY_GOVERNORATES = [c.get('governorate', 'Unknown') for c in CITIES.values()]
+_CITY_LATS = [c.get('lat') for c in CITIES.values()]
+_CITY_LNGS = [c.get('lng') for c in CITIES.values()]
+_CITY_LAT_RAD = np.radians(np.array(_CITY_LATS, dtype=np.float64))
+_CITY_LNG_RAD = np.radians(np.array(_CITY_LNGS, dtype=np.float64))
+_COS_CITY_LAT = np.cos(_CITY_LAT_RAD)
+
+# City id -> position in the per-city columns. The columns below carry one
+# trailing entry for unknown cities, so _CITY_INDEX.get(city_id, -1) always indexes.
+_CITY_INDEX = {city_id: i for i, city_id in enumerate(CITIES)}
+_POP = np.array([c.get('population', 0) for c in CITIES.values()] + [0], dtype=np.int64)
+_GOV = tuple(c.get('governorate', '') for c in CITIES.values()) + ('',)
+_NAME = tuple(c.get('name', 'Unknown City') for c in CITIES.values()) + ('Unknown City',)
+# City size class: 0 = up to 100k inhabitants, 1 = over 100k, 2 = over 200k
+_POP_BUCKET = (_POP > 100000).astype(np.intp) + (_POP > 200000)
+
+# Real-time traffic added by city size
+_CITY_SIZE_TRAFFIC = np.where(_POP[:-1] > 200000, 0.3, np.where(_POP[:-1] > 100000, 0.2, 0.0))
+
+# Hour of day -> time bucket, shared by every time-of-day rule
+_OFF_PEAK, _LUNCH, _MORNING_RUSH, _EVENING_RUSH = range(4)
+_HOUR_BUCKET = np.full(24, _OFF_PEAK, dtype=np.int8)
+_HOUR_BUCKET[12:15] = _LUNCH  # 12:00-14:59
+_HOUR_BUCKET[7:10] = _MORNING_RUSH  # 07:00-09:59
+_HOUR_BUCKET[16:20] = _EVENING_RUSH  # 16:00-19:59
+
+def _hour_bucket(hour):
+    """Time bucket for this hour; hours outside 0-23 count as off-peak"""
+    if isinstance(hour, int):
+        return int(_HOUR_BUCKET[hour]) if 0 <= hour < 24 else _OFF_PEAK
+    # Non-integer hours (e.g. 8.0 from a JSON body) use the ranges the table encodes
+    if 7 <= hour <= 9:
+        return _MORNING_RUSH
+    if 12 <= hour <= 14:
+        return _LUNCH
+    if 16 <= hour <= 19:
+        return _EVENING_RUSH
+    return _OFF_PEAK
+
+_DAYS = ('Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday')
+_LEVEL_NAMES = ('Low', 'Medium', 'High')
+
+# Traffic level display info, indexed by level, for prediction and city responses
+_TRAFFIC_LEVELS_PREDICTION = (
+    {"level": "Low", "color": "#28a745", "emoji": "✅"},
+    {"level": "Medium", "color": "#ffc107", "emoji": "⚠️"},
+    {"level": "High", "color": "#dc3545", "emoji": "🚨"}
+)
+_TRAFFIC_LEVELS_CITY = (
+    {"level": "Low", "color": "#28a745", "speed": "40-60 km/h"},
+    {"level": "Medium", "color": "#ffc107", "speed": "20-40 km/h"},
+    {"level": "High", "color": "#dc3545", "speed": "<20 km/h"}
+)
+
+# Average speed (km/h) per road type
+_SPEED_PROFILES = {
+    "highway": 90,  # Highways
+    "primary": 70,  # Primary roads
+    "secondary": 50,  # Secondary roads
+    "urban": 40,  # Urban roads
+    "rural": 60   # Rural roads
+}
+
+# Base delay factor per traffic level
+_TRAFFIC_IMPACTS = {0: 0.1, 1: 0.3, 2: 0.6}
+
+# Typical speed (km/h) per traffic level for simulated real-time data
+_LEVEL_SPEEDS = np.array([60, 40, 20])
+_LEVEL_BOUNDS = [0.4, 0.7]  # Real-time traffic scores above these are Medium / High
+
+# PCG64 generator for the simulated data, instead of the legacy global RandomState
+_RNG = np.random.default_rng()
+
+STATUS_MAX_AGE = 5  # Seconds clients may cache /api/system-status
+CITIES_MAX_AGE = 86400  # Seconds clients may cache /api/cities
+
+# The /api/cities payload never changes after import, so serialize it once
+_CITIES_JSON = orjson.dumps({
+    "success": True,
+    "cities": CITIES,
+    "governorates": GOVERNORATES,
+    "total_cities": len(CITIES)
+}, option=orjson.OPT_NON_STR_KEYS)
+_CITIES_ETAG = hashlib.md5(_CITIES_JSON).hexdigest()
+
+# The homepage's city dropdown and window.appData never change either, so render them once
+_DROPDOWN_HTML = Markup("\n".join(
+    f'<optgroup label="{escape(governorate)}">'
+    + "".join(f'<option value="{city["id"]}">{escape(city["name"])}</option>' for city in cities_list)
+    + '</optgroup>'
+    for governorate, cities_list in GOVERNORATES.items()
+))
+_APP_DATA_JSON = htmlsafe_json_dumps(
+    {"cities": CITIES, "governorates": GOVERNORATES},
+    dumps=lambda obj: orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS).decode()
+)
+
 # Configuration for free APIs
 USE_OPENROUTE_SERVICE = True  # Set to True for routing
 OPENROUTE_API_KEY = os.environ.get('OPENROUTE_API_KEY', '')  # Get free key from openrouteservice.org
 
 # Helper functions
-def calculate_distance(lat1, lng1, lat2, lng2):
-    """Calculate distance between two points in km using Haversine formula"""
-    R = 6371.0  # Earth radius in km
-    
-    lat1 = radians(lat1)
-    lon1 = radians(lng1)
-    lat2 = radians(lat2)
-    lon2 = radians(lng2)
-    
-    dlon = lon2 - lon1
-    dlat = lat2 - lat1
-    
-    a = sin(dlat / 2)**2 + cos(lat1) * cos(lat2) * sin(dlon / 2)**2
-    c = 2 * atan2(sqrt(a), sqrt(1 - a))
-    
-    return R * c
+def distance_to_city(lat, lng, i):
+    """Haversine distance in km from a point to the city at index i, using its precomputed trig"""
+    lat_rad = radians(lat)
+    dlat = _CITY_LAT_RAD[i] - lat_rad
+    dlon = _CITY_LNG_RAD[i] - radians(lng)
+    a = sin(dlat / 2)**2 + cos(lat_rad) * _COS_CITY_LAT[i] * sin(dlon / 2)**2
+    return float(2 * 6371.0 * asin(sqrt(a)))
 
 def calculate_eta_with_speed(distance_km, avg_speed_kmh, traffic_factor):
     """Calculate ETA based on distance, speed, and traffic"""
@@ -96,14 +222,6 @@ def calculate_eta_with_speed(distance_km, avg_speed_kmh, traffic_factor):
 
 def get_avg_speed_for_road_type(distance_km, road_type="urban"):
     """Get average speed based on road type and distance"""
-    speed_profiles = {
-        "highway": 90,  # Highways
-        "primary": 70,  # Primary roads
-        "secondary": 50,  # Secondary roads
-        "urban": 40,  # Urban roads
-        "rural": 60   # Rural roads
-    }
-    
     # Determine road type based on distance
     if distance_km > 100:
         road_type = "highway"
@@ -114,27 +232,37 @@ def get_avg_speed_for_road_type(distance_km, road_type="urban"):
     else:
         road_type = "urban"
     
-    return speed_profiles.get(road_type, 40)
+    return _SPEED_PROFILES.get(road_type, 40)
 
-def calculate_traffic_impact(traffic_level, weather_impact, hour):
-    """Calculate traffic impact factor based on various conditions"""
+def _compute_traffic_impact(traffic_level, weather_impact, hour):
+    """Traffic impact rules behind the _IMPACT lookup"""
     # Base impact from traffic level
-    traffic_impacts = {0: 0.1, 1: 0.3, 2: 0.6}
-    base_impact = traffic_impacts.get(traffic_level, 0.3)
+    base_impact = _TRAFFIC_IMPACTS.get(traffic_level, 0.3)
     
-    # Time of day multiplier
-    if 7 <= hour <= 9 or 16 <= hour <= 19:  # Rush hours
-        time_multiplier = 1.5
-    elif 12 <= hour <= 14:  # Lunch time
-        time_multiplier = 1.2
-    else:
-        time_multiplier = 1.0
+    # Time of day multiplier: off-peak, lunch time, morning rush, evening rush
+    time_multiplier = (1.0, 1.2, 1.5, 1.5)[_hour_bucket(hour)]
     
     # Weather impact
     weather_multiplier = 1 + (weather_impact * 0.3)
     
     return base_impact * time_multiplier * weather_multiplier
 
+# Traffic impact for every (traffic level, hour, weather impact), built once at import
+_WEATHER_IDX = {0: 0, 0.5: 1, 1: 2}
+_IMPACT = np.empty((3, 24, len(_WEATHER_IDX)))
+for _level in range(3):
+    for _hour in range(24):
+        for _impact, _w_idx in _WEATHER_IDX.items():
+            _IMPACT[_level, _hour, _w_idx] = _compute_traffic_impact(_level, _impact, _hour)
+
+def calculate_traffic_impact(traffic_level, weather_impact, hour):
+    """Calculate traffic impact factor based on various conditions"""
+    w_idx = _WEATHER_IDX.get(weather_impact)
+    if (w_idx is None or not (isinstance(traffic_level, int) and isinstance(hour, int))
+            or not (0 <= traffic_level < 3 and 0 <= hour < 24)):
+        return _compute_traffic_impact(traffic_level, weather_impact, hour)
+    return float(_IMPACT[traffic_level, hour, w_idx])
+
 def format_duration(minutes):
     """Format minutes to human-readable string"""
     hours = int(minutes // 60)
@@ -144,17 +272,12 @@ def format_duration(minutes):
         return f"{hours}h {mins}m"
     return f"{mins}m"
 
-def get_prediction(hour, day, city_id, weather):
-    """Enhanced prediction function"""
+def _compute_prediction(hour, day, pop_bucket, weather):
+    """Prediction rules behind the _PREDICTION_TABLE lookup"""
     score = 0
     
-    # Time impact
-    if 7 <= hour <= 9:  # Morning rush
-        score += 2
-    elif 16 <= hour <= 19:  # Evening rush
-        score += 2.5
-    elif 12 <= hour <= 14:  # Lunch time
-        score += 1
+    # Time impact: off-peak, lunch time, morning rush, evening rush
+    score += (0, 1, 2, 2.5)[_hour_bucket(hour)]
     
     # Day impact
     if day == 4:  # Friday prayer time impact
@@ -163,10 +286,9 @@ def get_prediction(hour, day, city_id, weather):
         score -= 0.5
     
     # City size impact
-    city = CITIES.get(city_id, {})
-    if city.get('population', 0) > 200000:
+    if pop_bucket == 2:
         score += 1.5
-    elif city.get('population', 0) > 100000:
+    elif pop_bucket == 1:
         score += 1
     
     # Weather impact
@@ -183,38 +305,82 @@ def get_prediction(hour, day, city_id, weather):
     else:
         return 0  # Low
 
-def get_recommendations(prediction, hour, city_id):
-    """Generate traffic recommendations"""
-    recommendations = []
-    
-    city = CITIES.get(city_id, {})
-    city_name = city.get('name', 'Unknown City')
-    
+# Predictions for every (hour, day, city size class, weather), built once at import
+_PREDICTION_TABLE = np.empty((24, 7, 3, 3), dtype=np.int8)
+for _hour in range(24):
+    for _day in range(7):
+        for _bucket in range(3):
+            for _weather in range(3):
+                _PREDICTION_TABLE[_hour, _day, _bucket, _weather] = _compute_prediction(
+                    _hour, _day, _bucket, _weather)
+
+def get_prediction(hour, day, city_id, weather):
+    """Enhanced prediction function"""
+    pop_bucket = _POP_BUCKET[_CITY_INDEX.get(city_id, -1)]
+    # The table only covers in-range ints; anything else (e.g. 8.0 or "1" from a JSON body) uses the rules
+    if not (isinstance(hour, int) and isinstance(day, int) and isinstance(weather, int)
+            and 0 <= hour < 24 and 0 <= day < 7 and 0 <= weather < 3):
+        return _compute_prediction(hour, day, pop_bucket, weather)
+    return int(_PREDICTION_TABLE[hour, day, pop_bucket, weather])
+
+# Index into the weather axis of _IMPACT for each weather condition id
+_WEATHER_IMPACT_IDX = np.array([_WEATHER_IDX[w["impact"]] for w in _WEATHER_LIST], dtype=np.intp)
+_ALL_CITY_INDEXES = np.arange(len(_CITY_IDS))
+
+def score_batch(hour, day, city_indexes, weather):
+    """
+    get_prediction and calculate_traffic_impact for the cities at city_indexes
+    (see _CITY_INDEX) in one table pass; hour, day and weather must be in-range ints
+    """
+    levels = _PREDICTION_TABLE[hour, day, _POP_BUCKET[city_indexes], weather]
+    impacts = _IMPACT[levels, hour, _WEATHER_IMPACT_IDX[weather]]
+    return levels, impacts
+
+# Governorates of the Grand Tunis area, and whether each city is in it
+_GRAND_TUNIS = frozenset(('Tunis', 'Ariana', 'Ben Arous', 'Manouba'))
+_IS_GRAND_TUNIS = tuple(governorate in _GRAND_TUNIS for governorate in _GOV)
+
+# Rush-hour tip per hour of day for high-traffic recommendations; the evening
+# tip covers 16:00-18:59, one hour less than the _EVENING_RUSH bucket
+_NO_TIP, _MORNING_TIP, _EVENING_TIP = range(3)
+_RUSH_TIP = np.full(24, _NO_TIP, dtype=np.int8)
+_RUSH_TIP[7:10] = _MORNING_TIP  # 07:00-09:59
+_RUSH_TIP[16:19] = _EVENING_TIP  # 16:00-18:59
+
+@lru_cache(maxsize=None)
+def _reco_template(prediction, rush_tip, is_grand_tunis):
+    """Headline (to be followed by the city name) and remaining tips for these conditions"""
     if prediction == 2:  # High traffic
-        recommendations.append(f"🚨 Heavy traffic expected in {city_name}")
-        recommendations.append("⏰ Allow 30-45 minutes extra travel time")
-        recommendations.append("🚗 Consider carpooling or public transport")
-        if hour in [7, 8, 9]:
-            recommendations.append("🕗 Avoid morning rush hours if possible")
-        elif hour in [16, 17, 18]:
-            recommendations.append("🕔 Evening peak - plan accordingly")
+        headline = "🚨 Heavy traffic expected in"
+        tips = ["⏰ Allow 30-45 minutes extra travel time",
+                "🚗 Consider carpooling or public transport"]
+        if rush_tip == _MORNING_TIP:
+            tips.append("🕗 Avoid morning rush hours if possible")
+        elif rush_tip == _EVENING_TIP:
+            tips.append("🕔 Evening peak - plan accordingly")
     
     elif prediction == 1:  # Medium traffic
-        recommendations.append(f"⚠️ Moderate traffic in {city_name}")
-        recommendations.append("📱 Check real-time updates before departure")
-        recommendations.append("⏱️ Normal travel time + 15 minutes")
+        headline = "⚠️ Moderate traffic in"
+        tips = ["📱 Check real-time updates before departure",
+                "⏱️ Normal travel time + 15 minutes"]
     
     else:  # Low traffic
-        recommendations.append(f"✅ Smooth traffic conditions in {city_name}")
-        recommendations.append("🚘 Normal travel time expected")
-        recommendations.append("🟢 Good time for travel")
+        headline = "✅ Smooth traffic conditions in"
+        tips = ["🚘 Normal travel time expected",
+                "🟢 Good time for travel"]
     
     # Add governorate-specific tips
-    governorate = city.get('governorate', '')
-    if governorate in ['Tunis', 'Ariana', 'Ben Arous', 'Manouba']:
-        recommendations.append("📍 Grand Tunis area - watch for main arteries")
+    if is_grand_tunis:
+        tips.append("📍 Grand Tunis area - watch for main arteries")
     
-    return recommendations
+    return headline, tuple(tips)
+
+def get_recommendations(prediction, hour, city_id):
+    """Generate traffic recommendations"""
+    i = _CITY_INDEX.get(city_id, -1)
+    rush_tip = int(_RUSH_TIP[hour]) if 0 <= hour < 24 else _NO_TIP
+    headline, tips = _reco_template(prediction, rush_tip, _IS_GRAND_TUNIS[i])
+    return (f"{headline} {_NAME[i]}",) + tips
 
 # === ROUTES ===
 
@@ -222,8 +388,8 @@ def get_recommendations(prediction, hour, city_id):
 def index():
     """Main page with enhanced ETA functionality"""
     return render_template("index.html",
-                         cities=CITIES,
-                         governorates=GOVERNORATES,
+                         dropdown_html=_DROPDOWN_HTML,
+                         app_data=_APP_DATA_JSON,
                          current_time=datetime.now())
 
 @main.route("/api/traffic-prediction", methods=["POST"])
@@ -235,25 +401,19 @@ def api_traffic_prediction():
         if not data:
             return jsonify({"success": False, "error": "No data provided"}), 400
         
-        hour = int(data.get("hour", datetime.now().hour))
-        day = int(data.get("day", datetime.now().weekday()))
+        now = datetime.now()
+        hour = int(data.get("hour", now.hour))
+        day = int(data.get("day", now.weekday()))
         city_id = int(data.get("city", 0))
         weather = int(data.get("weather", 0))
         
         prediction = get_prediction(hour, day, city_id, weather)
         
-        # Define traffic level info dictionary
-        traffic_levels = {
-            0: {"level": "Low", "color": "#28a745", "emoji": "✅"},
-            1: {"level": "Medium", "color": "#ffc107", "emoji": "⚠️"},
-            2: {"level": "High", "color": "#dc3545", "emoji": "🚨"}
-        }
-        
-        # Get traffic level info with safe default
-        traffic_level_info = traffic_levels.get(prediction, traffic_levels[0])
+        # Get traffic level info (predictions are always 0-2)
+        traffic_level_info = _TRAFFIC_LEVELS_PREDICTION[prediction]
         
         # Get city info
-        city_info = CITIES.get(city_id, CITIES.get(0))
+        city_info = _lookup_city(city_id) or _DEFAULT_CITY
         
         # Generate recommendations
         recommendations = get_recommendations(prediction, hour, city_id)
@@ -264,19 +424,57 @@ def api_traffic_prediction():
             "traffic_level": traffic_level_info,
             "city": city_info,
             "recommendations": recommendations,
-            "timestamp": datetime.now().isoformat()
+            "timestamp": now.isoformat()
         })
         
     except Exception as e:
         print(f"API error: {e}")
         return jsonify({"success": False, "error": str(e)}), 400
+
+@main.route("/api/model-prediction", methods=["GET"])
+def api_model_prediction():
+    """Traffic levels from the exported neural model for every city it was trained on"""
+    # Prefer the int8 export on the CPU; both are written by scripts/train_improved.py
+    model = load_quantized_model()
+    if model is None:
+        model = load_traced_model()
+    if model is None:
+        return jsonify({"success": False, "error": "No exported model available"}), 503
+    
+    try:
+        now = datetime.now()
+        hour = request.args.get("hour", now.hour, type=int)
+        day = request.args.get("day", now.weekday(), type=int)
+        weather = request.args.get("weather", 0, type=int)
+        if not (0 <= hour < 24 and 0 <= day < 7 and 0 <= weather < len(WEATHER_CONDITIONS)):
+            return jsonify({"success": False, "error": "hour, day or weather out of range"}), 400
+        
+        levels = predict_cities_batch(model, hour, day, weather)
+        
+        return jsonify({
+            "success": True,
+            "predictions": [
+                {
+                    "city_id": city_id,
+                    "city_name": city["name"],
+                    "prediction": level,
+                    "traffic_level": _TRAFFIC_LEVELS_PREDICTION[level]
+                }
+                for (city_id, city), level in zip(Config.CITIES.items(), levels.tolist())
+            ],
+            "timestamp": now.isoformat()
+        })
+        
+    except Exception as e:
+        print(f"Model prediction error: {e}")
+        return jsonify({"success": False, "error": str(e)}), 500
 # routes.py - Add this new endpoint
 
 @main.route("/api/traffic-for-city/<int:city_id>", methods=["GET"])
 def get_traffic_for_city(city_id):
     """Get traffic data for a specific city"""
     try:
-        city = CITIES.get(city_id)
+        city = _lookup_city(city_id)
         if not city:
             return jsonify({"success": False, "error": "City not found"}), 404
         
@@ -288,29 +486,20 @@ def get_traffic_for_city(city_id):
         prediction = get_prediction(hour, day, city_id, 0)  # Default weather
         
         # Simulate real-time traffic data
-        traffic_levels = {
-            0: {"level": "Low", "color": "#28a745", "speed": "40-60 km/h"},
-            1: {"level": "Medium", "color": "#ffc107", "speed": "20-40 km/h"},
-            2: {"level": "High", "color": "#dc3545", "speed": "<20 km/h"}
-        }
-        
-        traffic_info = traffic_levels.get(prediction, traffic_levels[0])
+        traffic_info = _TRAFFIC_LEVELS_CITY[prediction]
         
         # Add time-based factors
-        if 7 <= hour <= 9 or 16 <= hour <= 19:
+        hour_bucket = _hour_bucket(hour)
+        if hour_bucket >= _MORNING_RUSH:
             congestion = "Rush Hour"
             extra_time = "Add 30+ mins"
-        elif 12 <= hour <= 14:
+        elif hour_bucket == _LUNCH:
             congestion = "Lunch Time"
             extra_time = "Add 15 mins"
         else:
             congestion = "Normal"
             extra_time = "Normal time"
         
-        # Weather impact
-        weather_conditions = ["Clear", "Rain", "Fog"]
-        weather_emoji = ["☀️", "🌧️", "🌫️"]
-        
         return jsonify({
             "success": True,
             "city": city,
@@ -324,8 +513,8 @@ def get_traffic_for_city(city_id):
             },
             "time": {
                 "current": now.strftime("%H:%M"),
-                "day": now.strftime("%A"),
-                "rush_hour": (7 <= hour <= 9 or 16 <= hour <= 19)
+                "day": _DAYS[now.weekday()],
+                "rush_hour": hour_bucket >= _MORNING_RUSH
             },
             "recommendations": get_recommendations(prediction, hour, city_id)
         })
@@ -342,30 +531,28 @@ def api_calculate_eta():
         data = request.get_json()
         origin = data.get("origin")
         city_id = int(data.get("city_id"))
-        hour = data.get("hour", datetime.now().hour)
-        day = data.get("day", datetime.now().weekday())
+        now = datetime.now()
+        hour = data.get("hour", now.hour)
+        day = data.get("day", now.weekday())
         weather = data.get("weather", 0)
         
         if not origin or city_id is None:
             return jsonify({"success": False, "error": "Missing parameters"}), 400
         
         # Get city info
-        city = CITIES.get(city_id)
+        city = _lookup_city(city_id)
         if not city:
             return jsonify({"success": False, "error": "City not found"}), 404
         
         # Calculate straight-line distance
-        distance_km = calculate_distance(
-            origin['lat'], origin['lng'],
-            city['lat'], city['lng']
-        )
+        distance_km = distance_to_city(origin['lat'], origin['lng'], _CITY_INDEX[city_id])
         
         # Add 20% for road curvature (roads aren't straight)
         road_distance_km = distance_km * 1.2
         
         # Get traffic prediction
         traffic_prediction = get_prediction(hour, day, city_id, weather)
-        weather_impact = WEATHER_CONDITIONS.get(weather, WEATHER_CONDITIONS[0])["impact"]
+        weather_impact = _lookup_weather(weather)["impact"]
         
         # Calculate traffic impact
         traffic_impact = calculate_traffic_impact(traffic_prediction, weather_impact, hour)
@@ -400,7 +587,7 @@ def api_calculate_eta():
             },
             "traffic": {
                 "level": traffic_prediction,
-                "level_text": ["Low", "Medium", "High"][traffic_prediction],
+                "level_text": _LEVEL_NAMES[traffic_prediction],
                 "impact_factor": round(traffic_impact, 2)
             },
             "city": city
@@ -412,32 +599,17 @@ def api_calculate_eta():
 
 def generate_route_coordinates(origin, destination, steps=10):
     """Generate intermediate coordinates for a route"""
-    coords = []
-    
-    # Add start point
-    coords.append([origin['lat'], origin['lng']])
-    
-    # Generate intermediate points
-    for i in range(1, steps):
-        fraction = i / steps
-        lat = origin['lat'] + (destination['lat'] - origin['lat']) * fraction
-        lng = origin['lng'] + (destination['lng'] - origin['lng']) * fraction
-        
-        # Add some curvature to make it look like a real road
-        if steps > 3:
-            mid_point = steps // 2
-            if i == mid_point:
-                # Add slight curve in the middle
-                curve_factor = 0.1
-                lat += (np.random.random() - 0.5) * curve_factor
-                lng += (np.random.random() - 0.5) * curve_factor
-        
-        coords.append([lat, lng])
+    # Evenly spaced [lat, lng] points from start to end point, both included
+    coords = np.linspace([origin['lat'], origin['lng']],
+                         [destination['lat'], destination['lng']], steps + 1)
     
-    # Add end point
-    coords.append([destination['lat'], destination['lng']])
+    # Add some curvature to make it look like a real road
+    if steps > 3:
+        # Add slight curve in the middle
+        curve_factor = 0.1
+        coords[steps // 2] += (_RNG.random(2) - 0.5) * curve_factor
     
-    return coords
+    return coords  # Serialized as nested [lat, lng] lists by the orjson provider
 
 @main.route("/api/get-real-time-data", methods=["GET"])
 def get_real_time_data():
@@ -446,66 +618,63 @@ def get_real_time_data():
     This simulates real traffic conditions
     """
     try:
-        real_time_data = []
         now = datetime.now()
+        now_iso = now.isoformat()  # Shared by every record and the response timestamp
         hour = now.hour
         day = now.weekday()
+        n = len(_CITY_IDS)
         
-        for city_id, city in CITIES.items():
-            # Simulate traffic based on time and city
-            base_traffic = 0.3  # Base traffic
-            
-            # Time factors
-            if 7 <= hour <= 9 or 16 <= hour <= 19:  # Rush hours
-                base_traffic += 0.4
-            elif 12 <= hour <= 14:  # Lunch time
-                base_traffic += 0.2
-            
-            # Day factors
-            if day == 4:  # Friday
-                base_traffic += 0.3
-            elif day >= 5:  # Weekend
-                base_traffic -= 0.1
-            
-            # City size factor
-            if city.get('population', 0) > 200000:
-                base_traffic += 0.3
-            elif city.get('population', 0) > 100000:
-                base_traffic += 0.2
-            
-            # Add randomness
-            base_traffic += np.random.random() * 0.2 - 0.1
-            base_traffic = max(0.1, min(1.0, base_traffic))
-            
-            # Convert to traffic level
-            if base_traffic > 0.7:
-                traffic_level = 2
-            elif base_traffic > 0.4:
-                traffic_level = 1
-            else:
-                traffic_level = 0
-            
-            # Generate speed based on traffic
-            speeds = {0: 60, 1: 40, 2: 20}
-            speed = speeds.get(traffic_level, 40) + np.random.randint(-10, 10)
-            
-            real_time_data.append({
+        # Simulate traffic based on time and city, for all cities at once
+        base_traffic = 0.3  # Base traffic
+        
+        # Time factors: off-peak, lunch time, morning rush, evening rush
+        base_traffic += (0, 0.2, 0.4, 0.4)[_hour_bucket(hour)]
+        
+        # Day factors
+        if day == 4:  # Friday
+            base_traffic += 0.3
+        elif day >= 5:  # Weekend
+            base_traffic -= 0.1
+        
+        # City size factor and randomness
+        base_traffic = base_traffic + _CITY_SIZE_TRAFFIC + (_RNG.random(n) * 0.2 - 0.1)
+        np.clip(base_traffic, 0.1, 1.0, out=base_traffic)
+        
+        # Convert to traffic level
+        traffic_level = np.digitize(base_traffic, _LEVEL_BOUNDS, right=True)
+        
+        # Generate speed based on traffic
+        speed = _LEVEL_SPEEDS[traffic_level] + _RNG.integers(-10, 10, n)
+        
+        # Rule-based prediction and impact factor for every city, in clear weather
+        predicted_level, impact_factor = score_batch(hour, day, _ALL_CITY_INDEXES, 0)
+        
+        real_time_data = [
+            {
                 "city_id": city_id,
-                "city_name": city.get('name', 'Unknown'),
-                "governorate": city.get('governorate', 'Unknown'),
-                "lat": city.get('lat'),
-                "lng": city.get('lng'),
-                "traffic_level": traffic_level,
-                "traffic_score": round(base_traffic, 2),
-                "avg_speed": speed,
-                "congestion": int(base_traffic * 100),
-                "last_updated": now.isoformat()
-            })
+                "city_name": name,
+                "governorate": governorate,
+                "lat": lat,
+                "lng": lng,
+                "traffic_level": level,
+                "traffic_score": score,
+                "avg_speed": avg_speed,
+                "congestion": congestion,
+                "predicted_level": predicted,
+                "impact_factor": impact,
+                "last_updated": now_iso
+            }
+            for (city_id, name, governorate, lat, lng, level, score, avg_speed, congestion,
+                 predicted, impact) in zip(
+                _CITY_IDS, _CITY_NAMES, _CITY_GOVERNORATES, _CITY_LATS, _CITY_LNGS,
+                traffic_level, np.round(base_traffic, 2), speed, (base_traffic * 100).astype(int),
+                predicted_level, np.round(impact_factor, 2))
+        ]
         
         return jsonify({
             "success": True,
             "data": real_time_data,
-            "timestamp": now.isoformat(),
+            "timestamp": now_iso,
             "total_cities": len(real_time_data)
         })
         
@@ -516,36 +685,39 @@ def get_real_time_data():
 @main.route("/api/cities", methods=["GET"])
 def api_cities():
     """Get all cities grouped by governorate"""
-    return jsonify({
-        "success": True,
-        "cities": CITIES,
-        "governorates": GOVERNORATES,
-        "total_cities": len(CITIES)
-    })
+    response = Response(_CITIES_JSON, mimetype='application/json')
+    response.set_etag(_CITIES_ETAG)
+    response.headers['Cache-Control'] = f'public, max-age={CITIES_MAX_AGE}'
+    # Answers 304 Not Modified when the client's If-None-Match matches
+    return response.make_conditional(request)
 
 @main.route("/api/system-status")
 def system_status():
     """Get system status"""
     try:
-        return jsonify({
+        now_iso = datetime.now().isoformat()
+        response = jsonify({
             "success": True,
             "status": {
-                "last_update": datetime.now().isoformat(),
+                "last_update": now_iso,
                 "cities_loaded": len(CITIES),
                 "governorates": len(GOVERNORATES),
                 "routing_service": "Free Calculation",
                 "real_time_data": "Simulated"
             },
-            "current_time": datetime.now().isoformat(),
+            "current_time": now_iso,
             "timezone": "Africa/Tunis"
         })
+        # Let polling clients reuse the status for a few seconds
+        response.headers['Cache-Control'] = f'max-age={STATUS_MAX_AGE}'
+        return response
     except Exception as e:
         return jsonify({"success": False, "error": str(e)}), 500
 
 @main.route("/api/city/<int:city_id>")
 def get_city_info(city_id):
     """Get city information"""
-    city = CITIES.get(city_id)
+    city = _lookup_city(city_id)
     if city:
         return jsonify({
             "success": True,
@@ -11,16 +11,45 @@ class Config:
     MODELS_DIR = os.path.join(BASE_DIR, 'models')
     
     # File paths
-    TRAFFIC_DATASET_PATH = os.path.join(DATA_DIR, 'traffic_dataset.csv')
-    TIME_SERIES_PATH = os.path.join(DATA_DIR, 'traffic_time_series.csv')
+    TRAFFIC_DATASET_PATH = os.path.join(DATA_DIR, 'traffic_dataset.parquet')
+    LEGACY_DATASET_PATH = os.path.join(DATA_DIR, 'traffic_dataset.csv')  # Read once to migrate to Parquet
+    TIME_SERIES_PATH = os.path.join(DATA_DIR, 'traffic_time_series.parquet')
     LIVE_DATA_PATH = os.path.join(DATA_DIR, 'live_traffic_data.json')
     MODEL_PATH = os.path.join(MODELS_DIR, 'traffic_model.pth')
+    TRACED_MODEL_PATH = os.path.join(MODELS_DIR, 'traffic_model_enhanced.ptc')  # Frozen TorchScript export
+    QUANTIZED_MODEL_PATH = os.path.join(MODELS_DIR, 'traffic_model_int8.ptc')  # int8 TorchScript export for CPU
     LAST_UPDATE_FILE = os.path.join(DATA_DIR, 'last_update.txt')
+    TRAFFIC_BUFFER_PATH = os.path.join(DATA_DIR, 'traffic_buffer.npy')  # Ring buffer of recent rows
+    TRAFFIC_BUFFER_STATE_PATH = os.path.join(DATA_DIR, 'traffic_buffer.json')  # Ring buffer head/size
+    
+    # Dataset schema (all columns fit in int8)
+    DATASET_COLUMNS = ['hour', 'day', 'weekend', 'city', 'weather', 'traffic']
+    DATASET_DTYPES = {column: 'int8' for column in DATASET_COLUMNS}
+    DATASET_MAX_ROWS = 10000  # Keep only recent data (last 30 days equivalent)
+    DATASET_FLUSH_CYCLES = 24  # Update cycles between Parquet snapshots of the recent data
+    
+    # Model input columns, in order; built by create_enhanced_features in scripts/train_improved.py
+    FEATURE_COLUMNS = ['hour', 'day', 'weekend', 'city', 'weather',
+                       'sin_hour', 'cos_hour', 'sin_day', 'cos_day',
+                       'rush_hour', 'night_hour', 'friday', 'monday',
+                       'city_weight', 'weather_impact', 'rush_city', 'weekend_city']
+    
+    # Cities covered by the live traffic feed
+    CITIES = {
+        0: {"name": "Tunis", "lat": 36.8065, "lng": 10.1815},
+        1: {"name": "Ariana", "lat": 36.8625, "lng": 10.1956},
+        2: {"name": "Sfax", "lat": 34.7406, "lng": 10.7603},
+        3: {"name": "Sousse", "lat": 35.8254, "lng": 10.6360}
+    }
     
     # Map configuration
     MAP_CENTER = [34.0, 9.0]  # Tunisia center
     MAP_ZOOM = 7
     
+    # How often the live data and dataset are refreshed
+    DATA_UPDATE_INTERVAL = timedelta(hours=1)
+    MODEL_RETRAIN_INTERVAL = timedelta(days=7)
+    
     # Prediction thresholds
     TRAFFIC_THRESHOLDS = {
         'low': 0.3,
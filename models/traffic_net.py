@@ -39,12 +39,12 @@ class EnhancedTrafficNet(nn.Module):
         # Apply input normalization
         x = self.input_bn(x)
         
-        # Apply attention to time features (assuming first 4 features are time-based)
-        time_features = x[:, :4] if x.shape[1] >= 4 else x
+        # Apply attention to the sin/cos hour features (columns 5-6 of create_enhanced_features)
+        time_features = x[:, 5:7]
         attention_weights = self.time_attention(time_features)
         
-        # Apply attention
-        x = x * torch.cat([attention_weights] * (x.shape[1] // attention_weights.shape[1]), dim=1)
+        # Apply attention; the (B, 1) weights broadcast across all features
+        x = x * attention_weights
         
         # Pass through network
         return self.network(x)
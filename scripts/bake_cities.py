@@ -0,0 +1,27 @@
+import json
+import os
+from pprint import pformat
+
+APP_DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "app", "data")
+CITIES_FILE = os.path.join(APP_DATA_DIR, "tunisia_cities.json")
+BAKED_FILE = os.path.join(APP_DATA_DIR, "_cities_baked.py")
+
+def bake_cities(source=CITIES_FILE, target=BAKED_FILE):
+    """
+    Write tunisia_cities.json out as a Python module so the app imports
+    the cities as bytecode instead of parsing JSON at startup
+    """
+    with open(source, 'r', encoding='utf-8') as f:
+        raw = json.load(f)
+
+    cities = {int(k): v for k, v in raw.items()}
+
+    with open(target, 'w', encoding='utf-8') as f:
+        f.write("# Generated by scripts/bake_cities.py from tunisia_cities.json - do not edit\n")
+        f.write(f"CITIES = {pformat(cities, sort_dicts=False, width=120)}\n")
+
+    return cities
+
+if __name__ == "__main__":
+    cities = bake_cities()
+    print(f"✅ Baked {len(cities)} cities into {os.path.abspath(BAKED_FILE)}")
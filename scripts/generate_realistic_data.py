@@ -1,189 +1,217 @@
 import pandas as pd
 import numpy as np
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timedelta
-import random
 import os
 
-def generate_realistic_tunisian_traffic_data(num_samples=10000):
+# Tunisian cities with realistic traffic patterns
+CITIES = {
+    0: {"name": "Tunis", "population": 638845, "traffic_base": 0.8},
+    1: {"name": "Ariana", "population": 114486, "traffic_base": 0.7},
+    2: {"name": "Sfax", "population": 330440, "traffic_base": 0.6},
+    3: {"name": "Sousse", "population": 221530, "traffic_base": 0.5}
+}
+
+# Weather conditions with probabilities
+WEATHER_CONDITIONS = {
+    0: {"name": "Clear", "probability": 0.7, "impact": 0.0},
+    1: {"name": "Rain", "probability": 0.2, "impact": 0.3},
+    2: {"name": "Fog", "probability": 0.1, "impact": 0.2}
+}
+
+# Rows generated per chunk; datasets with several chunks are split across processes.
+# Fixed rather than derived from the CPU count, so the output only depends on the seed.
+GENERATION_CHUNK_SIZE = 5000
+
+# Score multiplier per city and score added per weather condition
+CITY_MULTIPLIERS = np.array([1.2, 1.1, 1.0, 0.9])  # Tunis, Ariana, Sfax, Sousse
+WEATHER_IMPACTS = np.array([0.0, 0.8, 0.5])  # Rain increases traffic, fog reduces speed
+
+# Weather probabilities (clear, rain, fog) for each month, January first
+_WINTER_WEATHER = [0.5, 0.4, 0.1]  # More rain
+_SPRING_WEATHER = [0.8, 0.1, 0.1]  # Mostly clear
+_SUMMER_FALL_WEATHER = [0.9, 0.05, 0.05]  # Very clear
+MONTHLY_WEATHER_PROBS = np.array(
+    [_WINTER_WEATHER] * 2 + [_SPRING_WEATHER] * 3 + [_SUMMER_FALL_WEATHER] * 5 + [_WINTER_WEATHER] * 2
+)
+
+# Score thresholds between Low/Medium and Medium/High traffic
+TRAFFIC_LEVEL_BOUNDS = [1.5, 3.5]
+
+# One int8 field per dataset column, in Config.DATASET_COLUMNS order
+DATASET_RECORD = np.dtype([(column, 'i1') for column in
+                           ('hour', 'day', 'weekend', 'city', 'weather', 'traffic')])
+
+def weighted_choice(weights, n, rng):
+    """Draw n indexes into weights, each with probability proportional to its weight"""
+    cdf = np.cumsum(weights, dtype=np.float64)
+    return np.searchsorted(cdf / cdf[-1], rng.random(n), side='right')
+
+def dataset_frame(hour, day, weekend, city_id, weather_id, traffic):
+    """Fill a preallocated int8 record array with the dataset columns and wrap it in a DataFrame"""
+    records = np.empty(len(hour), dtype=DATASET_RECORD)
+    records['hour'] = hour
+    records['day'] = day
+    records['weekend'] = weekend
+    records['city'] = city_id
+    records['weather'] = weather_id
+    records['traffic'] = traffic
+    return pd.DataFrame(records)
+
+def _generate_chunks(generate_chunk, seed, chunk_args):
+    """
+    Call generate_chunk(chunk_seed, args) for each entry of chunk_args, with seeds
+    spawned from one SeedSequence, and concatenate the resulting DataFrames in order;
+    several chunks run in parallel processes
+    """
+    seeds = np.random.SeedSequence(seed).spawn(len(chunk_args))
+    
+    if len(chunk_args) == 1:
+        return generate_chunk(seeds[0], chunk_args[0])
+    
+    # Each chunk has its own seed, so running them serially gives the same data
+    workers = min(len(chunk_args), os.cpu_count() or 1)
+    if workers == 1:
+        chunks = list(map(generate_chunk, seeds, chunk_args))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            chunks = list(executor.map(generate_chunk, seeds, chunk_args))
+    return pd.concat(chunks, ignore_index=True)
+
+def generate_realistic_tunisian_traffic_data(num_samples=10000, seed=42):
     """
     Generate realistic Tunisian traffic data with actual traffic patterns
     """
-    np.random.seed(42)
-    random.seed(42)
-    
-    # Tunisian cities with realistic traffic patterns
-    cities = {
-        0: {"name": "Tunis", "population": 638845, "traffic_base": 0.8},
-        1: {"name": "Ariana", "population": 114486, "traffic_base": 0.7},
-        2: {"name": "Sfax", "population": 330440, "traffic_base": 0.6},
-        3: {"name": "Sousse", "population": 221530, "traffic_base": 0.5}
-    }
-    
-    # Weather conditions with probabilities
-    weather_conditions = {
-        0: {"name": "Clear", "probability": 0.7, "impact": 0.0},
-        1: {"name": "Rain", "probability": 0.2, "impact": 0.3},
-        2: {"name": "Fog", "probability": 0.1, "impact": 0.2}
-    }
-    
-    data = []
-    
-    for _ in range(num_samples):
-        # Generate random timestamp within a year
-        day_of_year = random.randint(0, 364)
-        hour = random.randint(0, 23)
-        minute = random.randint(0, 59)
-        
-        # Convert to day of week (0=Monday, 6=Sunday)
-        day_of_week = (day_of_year + 1) % 7  # Start from Monday
-        weekend = 1 if day_of_week >= 5 else 0
-        
-        # Random city with weights based on population
-        city_id = random.choices(
-            list(cities.keys()), 
-            weights=[cities[0]["traffic_base"], cities[1]["traffic_base"], 
-                     cities[2]["traffic_base"], cities[3]["traffic_base"]]
-        )[0]
-        
-        # Random weather
-        weather_id = random.choices(
-            list(weather_conditions.keys()),
-            weights=[weather_conditions[0]["probability"], 
-                     weather_conditions[1]["probability"],
-                     weather_conditions[2]["probability"]]
-        )[0]
-        
-        # Calculate realistic traffic level (0=Low, 1=Medium, 2=High)
-        traffic_score = calculate_traffic_score(hour, day_of_week, weekend, city_id, weather_id)
-        
-        data.append([hour, day_of_week, weekend, city_id, weather_id, traffic_score])
-    
-    df = pd.DataFrame(data, columns=["hour", "day", "weekend", "city", "weather", "traffic"])
+    # Fixed-size chunks, so the data only depends on num_samples and seed, not on how it was run
+    sizes = [min(GENERATION_CHUNK_SIZE, num_samples - start)
+             for start in range(0, num_samples, GENERATION_CHUNK_SIZE)] or [0]
+    return _generate_chunks(_generate_chunk, seed, sizes)
+
+def _generate_chunk(seed, num_samples):
+    """Generate num_samples rows of the general dataset from their own seeded RNG"""
+    rng = np.random.default_rng(seed)
+    
+    # Sample every row at once
+    day_of_year = rng.integers(0, 365, num_samples)  # Random day within a year
+    hour = rng.integers(0, 24, num_samples)
+    
+    # Convert to day of week (0=Monday, 6=Sunday)
+    day_of_week = (day_of_year + 1) % 7  # Start from Monday
+    weekend = (day_of_week >= 5).astype(np.int8)
+    
+    # Random city with weights based on population
+    city_id = weighted_choice([city["traffic_base"] for city in CITIES.values()], num_samples, rng)
+    
+    # Random weather
+    weather_id = weighted_choice([weather["probability"] for weather in WEATHER_CONDITIONS.values()],
+                                 num_samples, rng)
+    
+    # Calculate realistic traffic level (0=Low, 1=Medium, 2=High)
+    traffic = calculate_traffic_score_batch(hour, day_of_week, city_id, weather_id, rng)
     
     # Add some noise to make it more realistic
-    df["traffic"] = df["traffic"].apply(lambda x: add_traffic_noise(x))
+    traffic = add_traffic_noise(traffic, rng)
     
-    return df
+    return dataset_frame(hour, day_of_week, weekend, city_id, weather_id, traffic)
 
-def calculate_traffic_score(hour, day, weekend, city_id, weather_id):
+def base_traffic_score(hour, day, weekend, city_id, weather_id):
     """
-    Calculate realistic traffic score based on Tunisian traffic patterns
+    Realistic traffic score from Tunisian traffic patterns over broadcastable
+    arrays, before special events and the conversion to a traffic level
     """
-    score = 0.0
-    
-    # 1. Time of day impact (based on real Tunisian rush hours)
-    # Morning rush: 7-9 AM (most intense in Tunis)
-    if 7 <= hour <= 9:
-        if city_id in [0, 1]:  # Tunis & Ariana
-            score += 2.5
-        else:  # Other cities
-            score += 1.5
-    
-    # Lunch time: 12-2 PM
-    elif 12 <= hour <= 14:
-        score += 0.8
-    
-    # Evening rush: 4-7 PM (most intense)
-    elif 16 <= hour <= 19:
-        if city_id in [0, 1]:
-            score += 3.0
-        else:
-            score += 2.0
-    
-    # Night time: 8 PM - 5 AM (low traffic)
-    elif 20 <= hour <= 23 or 0 <= hour <= 5:
-        score -= 1.0
-    
-    # 2. Day of week impact
-    # Fridays (day 4) have special traffic patterns (prayer time)
-    if day == 4:  # Friday
-        if 11 <= hour <= 13:  # Friday prayer time
-            score += 1.5
-        elif 14 <= hour <= 16:  # Post-prayer traffic
-            score += 1.0
-    
-    # Weekends generally have less traffic
-    if weekend:
-        if 10 <= hour <= 18:  # Weekend shopping/tourism hours
-            score += 0.5
-        else:
-            score -= 0.5
-    
-    # Mondays have more traffic (start of work week)
-    if day == 0 and 7 <= hour <= 9:
-        score += 0.5
+    busy_city = (city_id == 0) | (city_id == 1)  # Tunis & Ariana
+    morning_rush = (7 <= hour) & (hour <= 9)
+    
+    # 1. Time of day impact: morning rush, lunch time, evening rush, night time
+    score = np.select(
+        [morning_rush,
+         (12 <= hour) & (hour <= 14),
+         (16 <= hour) & (hour <= 19),
+         (20 <= hour) | (hour <= 5)],
+        [np.where(busy_city, 2.5, 1.5), 0.8, np.where(busy_city, 3.0, 2.0), -1.0],
+        0.0
+    )
+    
+    # 2. Day of week impact: Friday prayer and post-prayer traffic, weekends, Mondays
+    score += np.where(day == 4, np.select([(11 <= hour) & (hour <= 13), (14 <= hour) & (hour <= 16)],
+                                          [1.5, 1.0], 0.0), 0.0)
+    score += np.where(weekend == 1, np.where((10 <= hour) & (hour <= 18), 0.5, -0.5), 0.0)
+    score += np.where((day == 0) & morning_rush, 0.5, 0.0)
     
     # 3. City impact
-    city_multipliers = {0: 1.2, 1: 1.1, 2: 1.0, 3: 0.9}
-    score *= city_multipliers.get(city_id, 1.0)
+    score *= CITY_MULTIPLIERS[city_id]
     
     # 4. Weather impact
-    weather_impacts = {0: 0.0, 1: 0.8, 2: 0.5}  # Rain increases traffic, fog reduces speed
-    score += weather_impacts.get(weather_id, 0.0)
+    score += WEATHER_IMPACTS[weather_id]
     
-    # 5. Special events (simulated)
-    # Randomly add special events (holidays, accidents, etc.)
-    if random.random() < 0.02:  # 2% chance of special event
-        score += random.uniform(1.0, 2.0)
+    return score
+
+# base_traffic_score for every (hour, day, city, weather); weekend follows from the day
+_hour, _day, _city, _weather = np.indices((24, 7, len(CITY_MULTIPLIERS), len(WEATHER_IMPACTS)))
+BASE_SCORE_TABLE = base_traffic_score(_hour, _day, (_day >= 5).astype(np.int8), _city, _weather)
+del _hour, _day, _city, _weather
+
+def calculate_traffic_score_batch(hour, day, city_id, weather_id, rng):
+    """
+    Traffic levels for equal-length arrays: the base score looked up in
+    BASE_SCORE_TABLE, plus special events drawn from rng; returns int8 levels
+    """
+    score = BASE_SCORE_TABLE[hour, day, city_id, weather_id]
+    
+    # 5. Special events (2% chance each)
+    special_event = rng.random(len(score)) < 0.02
+    score += np.where(special_event, rng.uniform(1.0, 2.0, len(score)), 0.0)
     
     # Convert score to traffic level (0, 1, 2)
-    if score >= 3.5:
-        return 2  # High traffic
-    elif score >= 1.5:
-        return 1  # Medium traffic
-    else:
-        return 0  # Low traffic
-
-def add_traffic_noise(traffic_level):
-    """Add some randomness to traffic levels"""
-    noise = random.random()
-    if noise < 0.1:  # 10% chance to change level
-        if traffic_level == 0:
-            return 1 if random.random() < 0.5 else 0
-        elif traffic_level == 2:
-            return 1 if random.random() < 0.5 else 2
-        else:  # traffic_level == 1
-            return 0 if random.random() < 0.5 else 2
-    return traffic_level
-
-def generate_time_series_data(start_date="2024-01-01", end_date="2024-12-31"):
+    return np.digitize(score, TRAFFIC_LEVEL_BOUNDS).astype(np.int8)
+
+def add_traffic_noise(traffic, rng):
+    """Add some randomness to an array of traffic levels"""
+    change = rng.random(len(traffic)) < 0.1  # 10% chance to change level
+    flip = rng.random(len(traffic)) < 0.5
+    
+    noisy = traffic.copy()
+    noisy[change & flip & (traffic != 1)] = 1  # Low or High -> Medium
+    noisy[change & flip & (traffic == 1)] = 0  # Medium -> Low
+    noisy[change & ~flip & (traffic == 1)] = 2  # Medium -> High
+    return noisy
+
+def generate_time_series_data(start_date="2024-01-01", end_date="2024-12-31", seed=42):
     """Generate time-series traffic data"""
-    dates = pd.date_range(start=start_date, end=end_date, freq='H')
-    data = []
-    
-    for date in dates:
-        hour = date.hour
-        day = date.weekday()  # 0=Monday
-        weekend = 1 if day >= 5 else 0
-        
-        # More realistic city distribution
-        city_id = random.choices([0, 1, 2, 3], weights=[0.4, 0.3, 0.2, 0.1])[0]
-        
-        # Seasonal weather patterns
-        month = date.month
-        if month in [11, 12, 1, 2]:  # Winter months
-            weather_probs = [0.5, 0.4, 0.1]  # More rain
-        elif month in [3, 4, 5]:  # Spring
-            weather_probs = [0.8, 0.1, 0.1]  # Mostly clear
-        else:  # Summer and Fall
-            weather_probs = [0.9, 0.05, 0.05]  # Very clear
-        
-        weather_id = random.choices([0, 1, 2], weights=weather_probs)[0]
-        
-        # Calculate traffic
-        traffic = calculate_traffic_score(hour, day, weekend, city_id, weather_id)
-        
-        # Add holiday effects
-        if month == 1 and date.day == 1:  # New Year
-            traffic = min(2, traffic + 1)
-        elif month == 5 and date.day == 1:  # Labor Day
-            traffic = min(2, traffic + 1)
-        elif month == 7 and 25 <= date.day <= 27:  # Republic Day period
-            traffic = min(2, traffic + 1)
-        
-        data.append([hour, day, weekend, city_id, weather_id, traffic])
-    
-    return pd.DataFrame(data, columns=["hour", "day", "weekend", "city", "weather", "traffic"])
+    dates = pd.date_range(start=start_date, end=end_date, freq='h')
+    chunks = [dates[start:start + GENERATION_CHUNK_SIZE]
+              for start in range(0, len(dates), GENERATION_CHUNK_SIZE)] or [dates]
+    return _generate_chunks(_generate_time_series_chunk, seed, chunks)
+
+def _generate_time_series_chunk(seed, dates):
+    """Generate the time-series rows for these hourly timestamps from their own seeded RNG"""
+    rng = np.random.default_rng(seed)
+    n = len(dates)
+    
+    hour = dates.hour.to_numpy()
+    day = dates.weekday.to_numpy()  # 0=Monday
+    weekend = (day >= 5).astype(np.int8)
+    month = dates.month.to_numpy()
+    day_of_month = dates.day.to_numpy()
+    
+    # More realistic city distribution
+    city_id = weighted_choice([0.4, 0.3, 0.2, 0.1], n, rng)
+    
+    # Seasonal weather patterns, sampled against each row's monthly cumulative probabilities
+    weather_cdf = np.cumsum(MONTHLY_WEATHER_PROBS, axis=1)[month - 1]
+    weather_cdf[:, -1] = 1.0
+    weather_id = (rng.random(n)[:, None] < weather_cdf).argmax(axis=1)
+    
+    # Calculate traffic
+    traffic = calculate_traffic_score_batch(hour, day, city_id, weather_id, rng)
+    
+    # Add holiday effects: New Year, Labor Day, Republic Day period
+    holiday = (((month == 1) & (day_of_month == 1))
+               | ((month == 5) & (day_of_month == 1))
+               | ((month == 7) & (25 <= day_of_month) & (day_of_month <= 27)))
+    traffic = np.minimum(2, traffic + holiday).astype(np.int8)
+    
+    return dataset_frame(hour, day, weekend, city_id, weather_id, traffic)
 
 if __name__ == "__main__":
     print("Generating realistic Tunisian traffic data...")
@@ -194,11 +222,11 @@ if __name__ == "__main__":
     # Generate two types of datasets
     print("1. Generating general traffic dataset...")
     df_general = generate_realistic_tunisian_traffic_data(20000)
-    df_general.to_csv("data/traffic_dataset.csv", index=False)
+    df_general.to_parquet("data/traffic_dataset.parquet", compression="zstd", index=False)
     
     print("2. Generating time-series dataset...")
     df_time_series = generate_time_series_data()
-    df_time_series.to_csv("data/traffic_time_series.csv", index=False)
+    df_time_series.to_parquet("data/traffic_time_series.parquet", compression="zstd", index=False)
     
     print("\nDataset Summary:")
     print(f"Total samples: {len(df_general)}")
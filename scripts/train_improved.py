@@ -1,115 +1,254 @@
 import torch
 import torch.nn as nn
 import torch.optim as optim
+from torch.ao.quantization import fuse_modules, quantize_dynamic
 import pandas as pd
 import numpy as np
 from sklearn.model_selection import train_test_split
-from sklearn.preprocessing import StandardScaler, OneHotEncoder
+from sklearn.preprocessing import OneHotEncoder
 from sklearn.metrics import classification_report, confusion_matrix
 import matplotlib.pyplot as plt
 import seaborn as sns
 import os
 import sys
+import hashlib
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from models.traffic_net import EnhancedTrafficNet
+from config import Config
 
-class TrafficDataset(torch.utils.data.Dataset):
-    def __init__(self, features, labels):
-        self.features = torch.FloatTensor(features)
-        self.labels = torch.LongTensor(labels)
-    
-    def __len__(self):
-        return len(self.features)
-    
-    def __getitem__(self, idx):
-        return self.features[idx], self.labels[idx]
+# Feature values per city id (population impact) and per weather id
+CITY_WEIGHTS = np.array([1.0, 0.8, 0.6, 0.5], dtype=np.float32)
+WEATHER_IMPACT = np.array([0.0, 1.0, 0.5], dtype=np.float32)
+
+# Categorical dtypes whose codes are the city and weather ids
+CITY_CATEGORIES = pd.CategoricalDtype(range(len(CITY_WEIGHTS)))
+WEATHER_CATEGORIES = pd.CategoricalDtype(range(len(WEATHER_IMPACT)))
 
 def create_enhanced_features(df):
     """Create more sophisticated features"""
-    # Basic features
-    features = df[['hour', 'day', 'weekend', 'city', 'weather']].copy()
+    # City and weather as categoricals (a no-op if they already are); their codes are the ids
+    city = df['city'].astype(CITY_CATEGORIES).cat.codes.to_numpy()
+    weather = df['weather'].astype(WEATHER_CATEGORIES).cat.codes.to_numpy()
+    
+    # Ids outside the categories get code -1, which would silently index the last table entry
+    for name, codes, categories in (('city', city, CITY_CATEGORIES), ('weather', weather, WEATHER_CATEGORIES)):
+        if (codes < 0).any():
+            raise ValueError(f"{int((codes < 0).sum())} rows have a {name} id outside "
+                             f"{categories.categories.tolist()}")
     
-    # Time-based features
-    features['sin_hour'] = np.sin(2 * np.pi * df['hour'] / 24)
-    features['cos_hour'] = np.cos(2 * np.pi * df['hour'] / 24)
-    features['sin_day'] = np.sin(2 * np.pi * df['day'] / 7)
-    features['cos_day'] = np.cos(2 * np.pi * df['day'] / 7)
+    # Basic features
+    features = df[['hour', 'day', 'weekend']].copy()
+    features['city'] = city
+    features['weather'] = weather
+    
+    # Time-based features: one float32 angle array per period, shared by sin and cos
+    for column, period in (('hour', 24), ('day', 7)):
+        angles = df[column].to_numpy(np.float32) * np.float32(2 * np.pi / period)
+        sin_values = np.empty_like(angles)
+        cos_values = np.empty_like(angles)
+        np.sin(angles, out=sin_values)
+        np.cos(angles, out=cos_values)
+        features[f'sin_{column}'] = sin_values
+        features[f'cos_{column}'] = cos_values
     
     # Traffic patterns
-    features['rush_hour'] = df['hour'].apply(
-        lambda x: 1 if (7 <= x <= 9) or (16 <= x <= 19) else 0
-    )
-    features['night_hour'] = df['hour'].apply(lambda x: 1 if 0 <= x <= 5 else 0)
+    hour = df['hour'].to_numpy()
+    features['rush_hour'] = (((hour >= 7) & (hour <= 9)) | ((hour >= 16) & (hour <= 19))).astype(np.int8)
+    features['night_hour'] = ((hour >= 0) & (hour <= 5)).astype(np.int8)
     
     # Day type features
-    features['friday'] = (df['day'] == 4).astype(int)
-    features['monday'] = (df['day'] == 0).astype(int)
+    features['friday'] = (df['day'] == 4).astype(np.int8)
+    features['monday'] = (df['day'] == 0).astype(np.int8)
     
     # City features (population impact)
-    city_weights = {0: 1.0, 1: 0.8, 2: 0.6, 3: 0.5}
-    features['city_weight'] = df['city'].map(city_weights)
+    features['city_weight'] = CITY_WEIGHTS[city]
     
     # Weather impact
-    weather_impact = {0: 0.0, 1: 1.0, 2: 0.5}
-    features['weather_impact'] = df['weather'].map(weather_impact)
+    features['weather_impact'] = WEATHER_IMPACT[weather]
     
     # Interaction features
     features['rush_city'] = features['rush_hour'] * features['city_weight']
     features['weekend_city'] = df['weekend'] * features['city_weight']
     
-    return features
+    return features[Config.FEATURE_COLUMNS]  # The column order the served models expect
+
+def check_serving_features():
+    """
+    Raise if app.model_loader.city_feature_rows no longer matches
+    create_enhanced_features, so exports are never served inputs they weren't trained on
+    """
+    from app.model_loader import city_feature_rows
+    
+    # Every (hour, day, weather, city), with the cities innermost like city_feature_rows
+    shape = (24, 7, len(WEATHER_IMPACT), len(CITY_WEIGHTS))
+    hour, day, weather, city = (a.ravel() for a in np.indices(shape))
+    df = pd.DataFrame({'hour': hour, 'day': day, 'weekend': day >= 5,
+                       'city': city, 'weather': weather}).astype(np.int8)
+    expected = create_enhanced_features(df).to_numpy(np.float32).reshape(*shape, -1)
+    
+    for h, d, w in np.ndindex(*shape[:3]):
+        if not np.array_equal(city_feature_rows(h, d, w), expected[h, d, w]):
+            raise ValueError(f"app.model_loader.city_feature_rows({h}, {d}, {w}) "
+                             "differs from create_enhanced_features")
+
+def fold_scaler_into_input_bn(model, mean, scale):
+    """
+    Fold the (x - mean) / scale standardization into the model's input BatchNorm
+    running stats, so the model takes raw features
+    """
+    bn = model.input_bn
+    mean = torch.as_tensor(mean, dtype=bn.running_mean.dtype)
+    scale = torch.as_tensor(scale, dtype=bn.running_var.dtype)
+    with torch.no_grad():
+        # BN((x - m) / s) == BN'(x) with mean m + s * rm and variance s^2 * (rv + eps) - eps
+        bn.running_mean.copy_(mean + scale * bn.running_mean)
+        bn.running_var.copy_(scale ** 2 * (bn.running_var + bn.eps) - bn.eps)
+    return model
 
-def train_improved_model():
+def export_traced_model(model, input_size, path=Config.TRACED_MODEL_PATH):
+    """Trace the model in eval mode and freeze it, folding BatchNorm into the Linear layers"""
+    model.eval()
+    with torch.no_grad():
+        traced = torch.jit.freeze(torch.jit.trace(model, torch.randn(1, input_size)))
+    traced.save(path)
+    return traced
+
+def export_quantized_model(model, input_size, path=Config.QUANTIZED_MODEL_PATH):
+    """Fold BatchNorm into the Linear layers, quantize them to int8 and save as TorchScript"""
+    model.eval()
+    fused = fuse_modules(model, [['network.0', 'network.1'],
+                                 ['network.4', 'network.5'],
+                                 ['network.8', 'network.9']])
+    quantized = quantize_dynamic(fused, {nn.Linear}, dtype=torch.qint8)
+    with torch.no_grad():
+        traced = torch.jit.trace(quantized, torch.randn(1, input_size))
+    traced.save(path)
+    return traced
+
+# Bump whenever create_enhanced_features or the feature scaling changes, so cached splits are rebuilt
+FEATURE_CACHE_VERSION = 1
+
+def features_cache_path(data_path):
+    """
+    Path of the scaled-feature cache for data_path, keyed by a hash of its contents,
+    the feature columns and FEATURE_CACHE_VERSION
+    """
+    key = hashlib.md5(f"{FEATURE_CACHE_VERSION}:{','.join(Config.FEATURE_COLUMNS)}:".encode())
+    with open(data_path, 'rb') as f:
+        key.update(f.read())
+    digest = key.hexdigest()[:8]
+    return os.path.join(os.path.dirname(data_path), "cache", f"features_{digest}.npz")
+
+def compile_or_eager(net, example):
+    """
+    torch.compile(net), or net itself when the compile backend doesn't work here
+    (e.g. no C++ toolchain on a CPU-only host)
+    """
+    try:
+        model = torch.compile(net)
+        # Compilation is lazy; run one eval-mode pass so a broken backend fails now
+        net.eval()
+        with torch.no_grad():
+            model(example)
+        return model
+    except Exception as e:
+        print(f"⚠️ torch.compile unavailable, training uncompiled: {e}")
+        return net
+
+def train_improved_model(df=None, compile_model=True):
+    """
+    Train the model on df, or on the dataset file when no DataFrame is given;
+    compile_model=False skips torch.compile
+    """
     print("🚀 Training Enhanced Traffic Prediction Model...")
-    
-    # Load data
-    data_path = os.path.join("..", "data", "traffic_dataset.csv")
-    if not os.path.exists(data_path):
-        print("❌ Data file not found. Run generate_realistic_data.py first.")
-        return
-    
-    df = pd.read_csv(data_path)
-    print(f"📊 Loaded dataset with {len(df)} samples")
-    print(f"Traffic distribution:\n{df['traffic'].value_counts().sort_index()}")
-    
-    # Create enhanced features
-    X = create_enhanced_features(df)
-    y = df['traffic'].values
-    
-    print(f"📈 Feature matrix shape: {X.shape}")
-    
-    # Split data
-    X_train, X_test, y_train, y_test = train_test_split(
-        X, y, test_size=0.2, random_state=42, stratify=y
-    )
-    
-    # Normalize features
-    scaler = StandardScaler()
-    X_train_scaled = scaler.fit_transform(X_train)
-    X_test_scaled = scaler.transform(X_test)
-    
-    # Create datasets
-    train_dataset = TrafficDataset(X_train_scaled, y_train)
-    test_dataset = TrafficDataset(X_test_scaled, y_test)
-    
-    # Data loaders
-    train_loader = torch.utils.data.DataLoader(
-        train_dataset, batch_size=64, shuffle=True
-    )
-    test_loader = torch.utils.data.DataLoader(
-        test_dataset, batch_size=64, shuffle=False
-    )
+    check_serving_features()
+    
+    # Load data; when reading from disk, the scaled splits are cached per data file
+    cache_path = None
+    if df is None:
+        data_path = os.path.join("..", "data", "traffic_dataset.parquet")
+        legacy_path = os.path.join("..", "data", "traffic_dataset.csv")
+        if os.path.exists(data_path):
+            cache_path = features_cache_path(data_path)
+        elif os.path.exists(legacy_path):
+            cache_path = features_cache_path(legacy_path)
+        else:
+            print("❌ Data file not found. Run generate_realistic_data.py first.")
+            return
+    
+    if cache_path is not None and os.path.exists(cache_path):
+        with np.load(cache_path) as cache:
+            X_train_scaled, X_test_scaled = cache['X_train'], cache['X_test']
+            y_train, y_test = cache['y_train'], cache['y_test']
+            feature_mean, feature_scale = cache['mean'], cache['scale']
+            feature_names = cache['feature_names'].tolist()
+        print(f"📦 Loaded cached features from {cache_path}")
+    else:
+        if df is None:
+            if os.path.exists(data_path):
+                df = pd.read_parquet(data_path, columns=Config.DATASET_COLUMNS)
+            else:
+                df = pd.read_csv(legacy_path, dtype=Config.DATASET_DTYPES)
+        print(f"📊 Loaded dataset with {len(df)} samples")
+        df = df.astype({'city': CITY_CATEGORIES, 'weather': WEATHER_CATEGORIES})
+        print(f"Traffic distribution:\n{df['traffic'].value_counts().sort_index()}")
+        
+        # Create enhanced features
+        X = create_enhanced_features(df)
+        y = df['traffic'].values
+        feature_names = list(X.columns)
+        
+        print(f"📈 Feature matrix shape: {X.shape}")
+        
+        # Split data
+        X_train, X_test, y_train, y_test = train_test_split(
+            X, y, test_size=0.2, random_state=42, stratify=y
+        )
+        
+        # Normalize features with the training split's mean and standard deviation
+        feature_mean = X_train.to_numpy(np.float64).mean(axis=0)
+        feature_scale = X_train.to_numpy(np.float64).std(axis=0)
+        feature_scale[feature_scale == 0] = 1.0  # Leave constant features unscaled
+        X_train_scaled = ((X_train.to_numpy(np.float64) - feature_mean) / feature_scale).astype(np.float32, copy=False)
+        X_test_scaled = ((X_test.to_numpy(np.float64) - feature_mean) / feature_scale).astype(np.float32, copy=False)
+        
+        if cache_path is not None:
+            os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+            np.savez_compressed(cache_path, X_train=X_train_scaled, X_test=X_test_scaled,
+                                y_train=y_train, y_test=y_test,
+                                mean=feature_mean, scale=feature_scale,
+                                feature_names=np.array(feature_names))
+            print(f"📦 Cached features to {cache_path}")
+    
+    # Train on the GPU when there is one, with bf16 autocast (no loss scaling needed)
+    device = torch.device('cuda' if torch.cuda.is_available() else 'cpu')
+    use_bf16 = device.type == 'cuda'
+    print(f"🖥️ Training on {device}")
+    
+    # Keep each split as one tensor on the device; batches are slices of it.
+    # from_numpy shares the (already float32, contiguous) arrays rather than copying them
+    X_train_tensor = torch.from_numpy(np.ascontiguousarray(X_train_scaled, dtype=np.float32)).to(device)
+    y_train_tensor = torch.from_numpy(np.ascontiguousarray(y_train, dtype=np.int64)).to(device)
+    X_test_tensor = torch.from_numpy(np.ascontiguousarray(X_test_scaled, dtype=np.float32)).to(device)
+    y_test_tensor = torch.from_numpy(np.ascontiguousarray(y_test, dtype=np.int64)).to(device)
+    batch_size = 64
+    eval_batch_size = 4096
+    num_train_batches = (len(X_train_tensor) + batch_size - 1) // batch_size
     
     # Model
     input_size = X_train_scaled.shape[1]
-    model = EnhancedTrafficNet(input_size=input_size)
-    print(f"🤖 Model architecture:\n{model}")
+    net = EnhancedTrafficNet(input_size=input_size).to(device)
+    print(f"🤖 Model architecture:\n{net}")
+    
+    # Compiled wrapper for the training and validation passes; the weights stay
+    # shared with net, which is what gets saved and returned
+    model = compile_or_eager(net, X_test_tensor[:eval_batch_size]) if compile_model else net
     
     # Loss and optimizer
     criterion = nn.CrossEntropyLoss()
-    optimizer = optim.AdamW(model.parameters(), lr=0.001, weight_decay=1e-4)
+    optimizer = optim.AdamW(net.parameters(), lr=0.001, weight_decay=1e-4)
     scheduler = optim.lr_scheduler.ReduceLROnPlateau(
         optimizer, mode='max', factor=0.5, patience=5
     )
@@ -117,42 +256,45 @@ def train_improved_model():
     # Training loop
     num_epochs = 100
     best_accuracy = 0
+    model_path = os.path.join("..", "models", "traffic_model_enhanced.pth")
     train_losses = []
     val_accuracies = []
     
+    # Validation predictions are written into one preallocated buffer per epoch;
+    # the labels never change, so they are compared against y_test_tensor directly
+    all_predictions = torch.empty(len(X_test_tensor), dtype=torch.long, device=device)
+    
     for epoch in range(num_epochs):
         # Training
         model.train()
         train_loss = 0
-        for batch_features, batch_labels in train_loader:
-            optimizer.zero_grad()
-            outputs = model(batch_features)
-            loss = criterion(outputs, batch_labels)
+        permutation = torch.randperm(len(X_train_tensor), device=device)
+        for start in range(0, len(X_train_tensor), batch_size):
+            batch_indices = permutation[start:start + batch_size]
+            batch_features = X_train_tensor[batch_indices]
+            batch_labels = y_train_tensor[batch_indices]
+            optimizer.zero_grad(set_to_none=True)
+            with torch.autocast(device_type=device.type, dtype=torch.bfloat16, enabled=use_bf16):
+                outputs = model(batch_features)
+                loss = criterion(outputs, batch_labels)
             loss.backward()
             optimizer.step()
             train_loss += loss.item()
         
-        avg_train_loss = train_loss / len(train_loader)
+        avg_train_loss = train_loss / num_train_batches
         train_losses.append(avg_train_loss)
         
         # Validation
         model.eval()
-        correct = 0
-        total = 0
-        all_predictions = []
-        all_labels = []
         
-        with torch.no_grad():
-            for batch_features, batch_labels in test_loader:
+        with torch.inference_mode(), torch.autocast(device_type=device.type, dtype=torch.bfloat16, enabled=use_bf16):
+            for start in range(0, len(X_test_tensor), eval_batch_size):
+                batch_features = X_test_tensor[start:start + eval_batch_size]
                 outputs = model(batch_features)
-                _, predicted = torch.max(outputs, 1)
-                total += batch_labels.size(0)
-                correct += (predicted == batch_labels).sum().item()
-                
-                all_predictions.extend(predicted.numpy())
-                all_labels.extend(batch_labels.numpy())
+                all_predictions[start:start + eval_batch_size] = outputs.argmax(1)
         
-        accuracy = 100 * correct / total
+        correct = (all_predictions == y_test_tensor).sum().item()
+        accuracy = 100 * correct / len(y_test_tensor)
         val_accuracies.append(accuracy)
         
         # Learning rate scheduling
@@ -161,8 +303,7 @@ def train_improved_model():
         # Save best model
         if accuracy > best_accuracy:
             best_accuracy = accuracy
-            model_path = os.path.join("..", "models", "traffic_model_enhanced.pth")
-            torch.save(model.state_dict(), model_path)
+            torch.save(net.state_dict(), model_path)
         
         if (epoch + 1) % 10 == 0:
             print(f"Epoch [{epoch+1}/{num_epochs}], "
@@ -172,7 +313,19 @@ def train_improved_model():
     
     print(f"\n✅ Training completed! Best accuracy: {best_accuracy:.2f}%")
     
-    # Detailed evaluation
+    # Export the best weights as a frozen TorchScript model for serving; with the
+    # scaler folded in, the exported models take raw create_enhanced_features columns
+    best_model = EnhancedTrafficNet(input_size=input_size)
+    best_model.load_state_dict(torch.load(model_path, map_location='cpu'))
+    fold_scaler_into_input_bn(best_model, feature_mean, feature_scale)
+    export_traced_model(best_model, input_size)
+    print(f"⚡ Traced model saved to {Config.TRACED_MODEL_PATH}")
+    export_quantized_model(best_model, input_size)
+    print(f"⚡ int8 model saved to {Config.QUANTIZED_MODEL_PATH}")
+    
+    # Detailed evaluation (last epoch's predictions)
+    all_predictions = all_predictions.cpu().numpy()
+    all_labels = y_test_tensor.cpu().numpy()
     print("\n📋 Classification Report:")
     print(classification_report(all_labels, all_predictions, 
                                 target_names=['Low', 'Medium', 'High']))
@@ -213,28 +366,30 @@ def train_improved_model():
     
     # Feature importance (simple version)
     print("\n🔍 Analyzing feature importance...")
-    analyze_feature_importance(model, X.columns)
+    analyze_feature_importance(net, feature_names, X_test_tensor)
     
     print("\n🎯 Model saved to: ../models/traffic_model_enhanced.pth")
-    return model
+    return net
 
-def analyze_feature_importance(model, feature_names):
-    """Analyze feature importance using gradient-based method"""
+def analyze_feature_importance(model, feature_names, inputs=None):
+    """Analyze feature importance using gradient-based method, averaged over a batch of inputs"""
     model.eval()
     
-    # Create a sample input
-    sample_input = torch.randn(1, len(feature_names))
-    sample_input.requires_grad = True
+    # Use the given (scaled) inputs, or a random batch when there are none
+    device = next(model.parameters()).device
+    if inputs is None:
+        inputs = torch.randn(1024, len(feature_names), device=device)
+    sample_input = inputs.detach().clone().to(device).requires_grad_(True)
     
     # Forward pass
     output = model(sample_input)
     
     # Get gradients
     model.zero_grad()
-    output.backward(torch.ones_like(output))
+    output.sum().backward()
     
     # Calculate importance
-    importance = torch.abs(sample_input.grad).detach().numpy().flatten()
+    importance = sample_input.grad.abs().mean(dim=0).cpu().numpy()
     
     # Create importance dataframe
     importance_df = pd.DataFrame({